@@ -134,3 +134,7 @@ STATICFILES_DIRS = [
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
+
+# HabitLog rows older than this many days are moved to the archive table by
+# `manage.py archive_habit_logs` (see apps/us16_habit_tracking/archive.py).
+HABIT_LOG_HOT_DAYS = 400
@@ -4,7 +4,9 @@ from django.shortcuts import redirect
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 
-from core.views import calendar_view
+from core.views import (
+    calendar_view, calendar_range, calendar_cache_stats, dashboard, export_data, journal_view, search_view,
+)
 #from apps.us3_start_tracking.views import onboarding
 
 
@@ -14,11 +16,6 @@ def root_redirect(request):
     return redirect("login")
 
 
-@login_required
-def dashboard(request):
-    return redirect("calendar")
-
-
 def logout_view(request):
     logout(request)
     return redirect("login")
@@ -34,11 +31,6 @@ def daily_check_in(request):
     return redirect("calendar")
 
 
-@login_required
-def log_period(request):
-    return redirect("calendar")
-
-
 @login_required
 def insights(request):
     return redirect("calendar")
@@ -81,10 +73,14 @@ urlpatterns = [
     path('dashboard/', dashboard, name='dashboard'),
     #path('onboarding/', onboarding, name='onboarding'),
     path('calendar/', calendar_view, name='calendar'),
+    path('calendar/range/', calendar_range, name='calendar_range'),
+    path('calendar/cache-stats/', calendar_cache_stats, name='calendar_cache_stats'),
+    path('export/', export_data, name='export_data'),
+    path('search/', search_view, name='search'),
+    path('journal/', journal_view, name='journal'),
 
     # Placeholder endpoints referenced by templates
     path('check-in/', daily_check_in, name='daily_check_in'),
-    path('log-period/', log_period, name='log_period'),
     path('insights/', insights, name='insights'),
     path('garden/', garden, name='garden'),
     path('settings/', settings_view, name='settings'),
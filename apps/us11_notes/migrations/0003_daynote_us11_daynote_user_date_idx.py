@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us11_notes', '0002_alter_daynote_options_alter_daynote_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='daynote',
+            index=models.Index(fields=['user', 'date', 'created_at'], name='us11_daynote_user_date_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from core.querysets import DayQuerySet
+
 
 class DayNote(models.Model):
     user = models.ForeignKey(
@@ -16,9 +18,15 @@ class DayNote(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DayQuerySet.as_manager()
+
     class Meta:
         # multiple notes per day -> no unique constraint
         ordering = ("-date", "-created_at")
+        indexes = [
+            # per-user date ranges (the (user, date) prefix), with a day's notes in created_at order
+            models.Index(fields=["user", "date", "created_at"], name="us11_daynote_user_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.date} ({self.id})"
\ No newline at end of file
@@ -5,4 +5,5 @@ urlpatterns = [
     path("notes/<str:date_str>/", views.notes_for_day, name="notes_for_day"),
     path("notes/<str:date_str>/<int:note_id>/edit/", views.edit_note, name="edit_note"),
     path("notes/<str:date_str>/<int:note_id>/delete/", views.delete_note, name="delete_note"),
+    path("api/notes/<int:note_id>/", views.api_note, name="api_note"),
 ]
\ No newline at end of file
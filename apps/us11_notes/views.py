@@ -1,11 +1,21 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import redirect, render, get_object_or_404
+from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_http_methods, require_POST
+
+from core import calendar_cache
 
 from .forms import DayNoteForm
 from .models import DayNote
 
+AUTOSAVE_FIELDS = ("title", "body")
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
 
 def _parse_day(date_str: str):
     day = parse_date(date_str)
@@ -34,7 +44,7 @@ def notes_for_day(request, date_str):
     else:
         form = DayNoteForm()
 
-    notes = DayNote.objects.filter(user=request.user, date=day).order_by("-created_at")
+    notes = DayNote.objects.for_user_day(request.user, day).order_by("-created_at")
 
     return render(request, "pages/notes/day_notes.html", {
         "day": day,
@@ -64,6 +74,7 @@ def edit_note(request, date_str, note_id):
         "day": day,
         "note": note,
         "form": form,
+        "etag": note_etag(note.updated_at),
     })
 
 
@@ -77,4 +88,99 @@ def delete_note(request, date_str, note_id):
     day = _parse_day(date_str)
     note = get_object_or_404(DayNote, id=note_id, user=request.user, date=day)
     note.delete()
-    return redirect("notes_for_day", date_str=date_str)
\ No newline at end of file
+    return redirect("notes_for_day", date_str=date_str)
+
+
+def note_etag(updated_at):
+    """Strong ETag for a note version: updated_at in microseconds since the epoch."""
+    return f'"{(updated_at - EPOCH) // timedelta(microseconds=1)}"'
+
+
+def _parse_etag(header):
+    """updated_at from an If-Match value, None for "*", ValueError if malformed."""
+    value = header.strip()
+    if value == "*":
+        return None
+    if not (len(value) > 2 and value[0] == value[-1] == '"'):
+        raise ValueError("Invalid ETag")
+    return EPOCH + timedelta(microseconds=int(value[1:-1]))
+
+
+def _autosave_changes(payload):
+    """Validated {field: value} for the fields the client sent; ValueError otherwise."""
+    if not isinstance(payload, dict) or not payload:
+        raise ValueError("Send at least one of: " + ", ".join(AUTOSAVE_FIELDS))
+    unknown = set(payload) - set(AUTOSAVE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    changes = {}
+    for name, value in payload.items():
+        if not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+        field = DayNote._meta.get_field(name)
+        if field.max_length and len(value) > field.max_length:
+            raise ValueError(f"{name} is limited to {field.max_length} characters")
+        if not field.blank and not value.strip():
+            raise ValueError(f"{name} can't be empty")
+        changes[name] = value
+    return changes
+
+
+def _note_json(note, status=200):
+    response = JsonResponse({
+        "id": note["id"],
+        "date": note["date"].isoformat(),
+        "title": note["title"],
+        "body": note["body"],
+        "updated_at": note["updated_at"].isoformat(),
+    }, status=status)
+    response["ETag"] = note_etag(note["updated_at"])
+    return response
+
+
+@login_required
+@require_http_methods(["GET", "PATCH"])
+def api_note(request, note_id):
+    """
+    GET: the note and its ETag.
+    PATCH: JSON with only the changed fields ({"title": ..., "body": ...}) and
+    If-Match: <ETag>. The write is a single conditional UPDATE, so a save made
+    from another device since the client's last read is never overwritten:
+    the client gets 412 with the current note instead and can merge.
+    """
+    notes = DayNote.objects.filter(id=note_id, user=request.user)
+    fields = ("id", "date", "title", "body", "updated_at")
+
+    if request.method == "GET":
+        note = notes.values(*fields).first()
+        if note is None:
+            return JsonResponse({"error": "No such note"}, status=404)
+        return _note_json(note)
+
+    if "HTTP_IF_MATCH" not in request.META:
+        return JsonResponse({"error": "If-Match is required"}, status=428)
+    try:
+        expected = _parse_etag(request.META["HTTP_IF_MATCH"])
+        changes = _autosave_changes(json.loads(request.body or b"{}"))
+    except OverflowError:
+        return JsonResponse({"error": "Invalid ETag"}, status=400)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # .update() skips auto_now, so the new version is stamped here
+    updated_at = timezone.now()
+    matching = notes if expected is None else notes.filter(updated_at=expected)
+    if matching.update(**changes, updated_at=updated_at):
+        # search stays in sync through triggers; day summaries only count notes,
+        # so the calendar's note previews are all that go stale
+        calendar_cache.bump_epoch(request.user.id)
+        response = JsonResponse({"updated_at": updated_at.isoformat()})
+        response["ETag"] = note_etag(updated_at)
+        return response
+
+    # nothing updated: either the note is gone or someone saved in between
+    note = notes.values(*fields).first()
+    if note is None:
+        return JsonResponse({"error": "No such note"}, status=404)
+    return _note_json(note, status=412)
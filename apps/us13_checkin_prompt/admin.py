@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import CheckInPrompt, DailyCheckIn
+
+
+@admin.register(CheckInPrompt)
+class CheckInPromptAdmin(admin.ModelAdmin):
+    list_display = ("text", "weight", "is_active")
+    list_filter = ("is_active",)
+    list_editable = ("weight", "is_active")
+    search_fields = ("text",)
+
+
+@admin.register(DailyCheckIn)
+class DailyCheckInAdmin(admin.ModelAdmin):
+    list_display = ("user", "date", "status", "refresh_count")
+    list_filter = ("status", "date")
+    search_fields = ("user__username", "prompt_text")
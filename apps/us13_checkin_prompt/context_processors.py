@@ -7,6 +7,8 @@ Register in settings.py → TEMPLATES[0]['OPTIONS']['context_processors']:
     'checkin.context_processors.daily_checkin',
 """
 
+from django.utils.functional import SimpleLazyObject
+
 from .views import get_checkin_context
 
 
@@ -14,6 +16,8 @@ def daily_checkin(request):
     """
     Makes `show_checkin` and `checkin` available in every template.
     Skips gracefully for unauthenticated users and non-HTML requests (e.g. API).
+    Both are lazy: nothing is looked up unless a template reads them, and then
+    it comes from the session state in views.py (never a write to the row).
     """
     if not request.user.is_authenticated:
         return {"show_checkin": False, "checkin": None}
@@ -22,4 +26,13 @@ def daily_checkin(request):
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return {}
 
-    return get_checkin_context(request.user)
\ No newline at end of file
+    # a view that already loaded today's check-in can hand it over
+    preloaded = getattr(request, "checkin_context", None)
+    if preloaded is not None:
+        return preloaded
+
+    context = SimpleLazyObject(lambda: get_checkin_context(request))
+    return {
+        "show_checkin": SimpleLazyObject(lambda: context["show_checkin"]),
+        "checkin":      SimpleLazyObject(lambda: context["checkin"]),
+    }
\ No newline at end of file
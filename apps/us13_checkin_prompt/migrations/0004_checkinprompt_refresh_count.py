@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us13_checkin_prompt', '0003_alter_dailycheckin_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckInPrompt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(unique=True)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='dailycheckin',
+            name='refresh_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# the questions that used to be hard-coded in views.PROMPTS
+PROMPTS = [
+    "What's one thing you're looking forward to today?",
+    "How are you feeling going into today?",
+    "What's something you accomplished yesterday that you're proud of?",
+    "What's your main focus for today?",
+    "Is there anything on your mind that you'd like to clear before starting?",
+    "What would make today feel like a success?",
+    "How's your energy level right now?",
+    "What's one small win you can aim for today?",
+    "Is there anything you need support with today?",
+    "What intention do you want to set for today?",
+    "How did yesterday go, and what would you do differently?",
+    "What are you grateful for this morning?",
+    "What's one challenge you're anticipating today?",
+    "How are you taking care of yourself today?",
+    "What's something you've been putting off that you could tackle today?",
+]
+
+
+def seed_checkin_prompts(apps, schema_editor):
+    CheckInPrompt = apps.get_model("us13_checkin_prompt", "CheckInPrompt")
+    for text in PROMPTS:
+        CheckInPrompt.objects.get_or_create(text=text, defaults={"weight": 1, "is_active": True})
+
+
+def unseed_checkin_prompts(apps, schema_editor):
+    CheckInPrompt = apps.get_model("us13_checkin_prompt", "CheckInPrompt")
+    CheckInPrompt.objects.filter(text__in=PROMPTS).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("us13_checkin_prompt", "0004_checkinprompt_refresh_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_checkin_prompts, unseed_checkin_prompts),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us13_checkin_prompt', '0005_seed_checkin_prompts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckInPromptVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
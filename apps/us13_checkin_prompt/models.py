@@ -2,11 +2,45 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from core.querysets import DayQuerySet
+
+
+class CheckInPrompt(models.Model):
+    """
+    One question in the daily check-in bank. Higher weight = picked more often;
+    inactive prompts are never picked. See prompts.py.
+    """
+
+    text       = models.TextField(unique=True)
+    weight     = models.PositiveSmallIntegerField(default=1)
+    is_active  = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return self.text
+
+
+class CheckInPromptVersion(models.Model):
+    """
+    Single row whose number goes up whenever a CheckInPrompt is saved or
+    deleted; workers compare it against their loaded bank (see prompts.py).
+    """
+
+    version    = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Check-in prompts v{self.version}"
+
 
 class DailyCheckIn(models.Model):
     """
     Tracks one check-in record per user per day.
-    A record is created the first time the prompt is shown.
+    A record is created the first time the user acts on the prompt
+    (dismiss, answer or refresh); merely showing it writes nothing.
     Status transitions: pending → dismissed | completed
     """
 
@@ -25,11 +59,15 @@ class DailyCheckIn(models.Model):
     status        = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
     prompt_text   = models.TextField()                        # the question shown that day
     response_text = models.TextField(blank=True, default="") # user's answer (if completed)
+    refresh_count = models.PositiveSmallIntegerField(default=0)  # "New question" presses today
     created_at    = models.DateTimeField(auto_now_add=True)
     updated_at    = models.DateTimeField(auto_now=True)
 
+    objects = DayQuerySet.as_manager()
+
     class Meta:
-        unique_together = ("user", "date")   # enforces one record per user per day
+        # one record per user per day; the unique index also serves (user, date) ranges
+        unique_together = ("user", "date")
         ordering = ["-date"]
 
     def __str__(self):
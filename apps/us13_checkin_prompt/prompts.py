@@ -0,0 +1,79 @@
+"""
+checkin/prompts.py
+
+Daily prompt selection from the CheckInPrompt bank.
+
+The prompt for a user's day is a pure function of (user_id, date,
+refresh_count): a hash picks a weighted slot in the active prompts. So the
+prompt on screen can be recomputed on every page with no DB access and never
+has to be stored just to stay stable; only dismiss/complete/refresh write.
+
+The bank itself is loaded once per worker. Saving or deleting a prompt bumps
+the CheckInPromptVersion row (core/signals.py), which reloads it (see
+core/versioned.py).
+"""
+
+import hashlib
+from bisect import bisect_right
+from itertools import accumulate
+
+from core.versioned import VersionedCache
+
+from .models import CheckInPrompt, CheckInPromptVersion
+
+FALLBACK_PROMPT = "How are you feeling going into today?"
+MAX_REPICKS = 8  # attempts at a prompt different from the previous one
+
+
+class PromptBank:
+    """Active prompts with cumulative weights for O(log n) weighted picks."""
+
+    __slots__ = ("version", "texts", "cumulative")
+
+    def __init__(self, version, rows):
+        rows = [(text, weight) for text, weight in rows if weight > 0]
+        self.version = version
+        self.texts = tuple(text for text, _ in rows) or (FALLBACK_PROMPT,)
+        self.cumulative = tuple(accumulate(weight for _, weight in rows)) or (1,)
+
+    def pick(self, seed):
+        return self.texts[bisect_right(self.cumulative, seed % self.cumulative[-1])]
+
+
+def _load(version):
+    rows = CheckInPrompt.objects.filter(is_active=True).order_by("id").values_list("text", "weight")
+    return PromptBank(version, rows)
+
+
+_bank = VersionedCache(CheckInPromptVersion, _load)
+
+
+def get_bank():
+    """The worker's bank, reloaded if the version row has moved since the last check."""
+    return _bank.get()
+
+
+def bump_version():
+    """Invalidate every worker's bank; this worker reloads on its next read."""
+    _bank.bump()
+
+
+def _seed(user_id, day, refresh_count, attempt=0):
+    key = f"{user_id}:{day.isoformat()}:{refresh_count}:{attempt}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+def prompt_for(user_id, day, refresh_count=0, exclude=None):
+    """
+    The prompt for a user's day after `refresh_count` refreshes, avoiding
+    `exclude` (the prompt being replaced) whenever the bank has another one.
+    """
+    bank = get_bank()
+    text = bank.pick(_seed(user_id, day, refresh_count))
+    attempt = 0
+    while text == exclude and len(bank.texts) > 1:
+        attempt += 1
+        if attempt > MAX_REPICKS:
+            return bank.texts[(bank.texts.index(text) + 1) % len(bank.texts)]
+        text = bank.pick(_seed(user_id, day, refresh_count, attempt))
+    return text
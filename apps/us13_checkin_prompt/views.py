@@ -1,68 +1,70 @@
-import random
 from django.contrib.auth.decorators import login_required
 from django.http  import JsonResponse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
 from .models import DailyCheckIn
+from .prompts import prompt_for
 
-# ── Prompt bank ───────────────────────────────────────────────────────────────
-# Add, remove, or load from DB however you like.
-PROMPTS = [
-    "What's one thing you're looking forward to today?",
-    "How are you feeling going into today?",
-    "What's something you accomplished yesterday that you're proud of?",
-    "What's your main focus for today?",
-    "Is there anything on your mind that you'd like to clear before starting?",
-    "What would make today feel like a success?",
-    "How's your energy level right now?",
-    "What's one small win you can aim for today?",
-    "Is there anything you need support with today?",
-    "What intention do you want to set for today?",
-    "How did yesterday go, and what would you do differently?",
-    "What are you grateful for this morning?",
-    "What's one challenge you're anticipating today?",
-    "How are you taking care of yourself today?",
-    "What's something you've been putting off that you could tackle today?",
-]
-
-
-def _pick_prompt(exclude_text=None):
-    """Return a random prompt, optionally avoiding the currently shown one."""
-    pool = [p for p in PROMPTS if p != exclude_text] or PROMPTS
-    return random.choice(pool)
+# ── Today's state (kept in the session, read-only) ────────────────────────────
+# Showing the card never writes: until the user dismisses, answers or refreshes,
+# today's prompt is computed from (user, date) by prompt_for(). The state is kept
+# in the user's session, which every worker reads, and the endpoints below store
+# the row's new state there once it is written.
+
+SESSION_KEY = "checkin_today"
+
+
+def _todays_state(request, today):
+    """{'status', 'prompt_text'} for today: from the session, else one SELECT."""
+    stored = request.session.get(SESSION_KEY)
+    if stored and stored["date"] == today.isoformat():
+        return stored["state"]
+
+    state = (
+        DailyCheckIn.objects.for_user_day(request.user, today)
+        .values("status", "prompt_text").first()
+    ) or {"status": DailyCheckIn.STATUS_PENDING, "prompt_text": prompt_for(request.user.id, today)}
+    request.session[SESSION_KEY] = {"date": today.isoformat(), "state": state}
+    return state
+
+
+def _todays_checkin(request, today):
+    """Today's row, created from the prompt the user is looking at."""
+    checkin, _ = DailyCheckIn.objects.get_or_create(
+        user     = request.user,
+        date     = today,
+        defaults = {"prompt_text": _todays_state(request, today)["prompt_text"]},
+    )
+    return checkin
+
+
+def remember_checkin(request, checkin):
+    """Store today's row as the session's state; call after writing it."""
+    state = {"status": checkin.status, "prompt_text": checkin.prompt_text}
+    request.session[SESSION_KEY] = {"date": checkin.date.isoformat(), "state": state}
 
 
 # ── Context helper (call from your base view or context processor) ─────────────
 
-def get_checkin_context(user):
+def get_checkin_context(request):
     """
     Returns a dict ready to pass into any template context:
         {
             'show_checkin': True/False,
-            'checkin':      DailyCheckIn instance | None,
+            'checkin':      {'status', 'prompt_text'} | None,
         }
 
     Usage in a view:
-        context.update(get_checkin_context(request.user))
+        context.update(get_checkin_context(request))
     """
-    if not user.is_authenticated:
+    if not request.user.is_authenticated:
         return {"show_checkin": False, "checkin": None}
 
-    today   = timezone.localdate()
-    checkin = DailyCheckIn.objects.filter(user=user, date=today).first()
-
-    if checkin is None:
-        # First visit today – create a pending record
-        checkin = DailyCheckIn.objects.create(
-            user        = user,
-            date        = today,
-            prompt_text = _pick_prompt(),
-        )
-
+    state = _todays_state(request, timezone.localdate())
     return {
-        "show_checkin": checkin.is_actionable,
-        "checkin":      checkin,
+        "show_checkin": state["status"] == DailyCheckIn.STATUS_PENDING,
+        "checkin":      state,
     }
 
 
@@ -73,10 +75,11 @@ def get_checkin_context(user):
 def dismiss_checkin(request):
     """Dismiss today's prompt without answering."""
     today   = timezone.localdate()
-    checkin = DailyCheckIn.objects.filter(user=request.user, date=today).first()
+    checkin = _todays_checkin(request, today)
 
-    if checkin and checkin.is_actionable:
+    if checkin.is_actionable:
         checkin.dismiss()
+    remember_checkin(request, checkin)
 
     return JsonResponse({"status": "dismissed"})
 
@@ -87,25 +90,30 @@ def complete_checkin(request):
     """Save the user's response and mark as completed."""
     today    = timezone.localdate()
     response = request.POST.get("response", "").strip()
-    checkin  = DailyCheckIn.objects.filter(user=request.user, date=today).first()
+    checkin  = _todays_checkin(request, today)
 
-    if checkin and checkin.is_actionable:
+    if checkin.is_actionable:
         checkin.complete(response_text=response)
+        remember_checkin(request, checkin)
         return JsonResponse({"status": "completed"})
 
+    remember_checkin(request, checkin)
     return JsonResponse({"status": "already_resolved"})
 
 
 @login_required
 @require_POST
 def refresh_prompt(request):
-    """Swap today's prompt for a new random question (without resolving the check-in)."""
+    """Swap today's prompt for the next question in the user's sequence (without resolving the check-in)."""
     today   = timezone.localdate()
-    checkin = DailyCheckIn.objects.filter(user=request.user, date=today).first()
+    checkin = _todays_checkin(request, today)
 
-    if checkin and checkin.is_actionable:
-        checkin.prompt_text = _pick_prompt(exclude_text=checkin.prompt_text)
-        checkin.save(update_fields=["prompt_text", "updated_at"])
+    if checkin.is_actionable:
+        checkin.refresh_count += 1
+        checkin.prompt_text = prompt_for(request.user.id, today, checkin.refresh_count, exclude=checkin.prompt_text)
+        checkin.save(update_fields=["prompt_text", "refresh_count", "updated_at"])
+        remember_checkin(request, checkin)
         return JsonResponse({"status": "ok", "prompt": checkin.prompt_text})
 
+    remember_checkin(request, checkin)
     return JsonResponse({"status": "not_actionable"}, status=400)
\ No newline at end of file
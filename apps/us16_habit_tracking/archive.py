@@ -0,0 +1,208 @@
+"""
+Cold tier for HabitLog.
+
+Logs older than settings.HABIT_LOG_HOT_DAYS are moved, one habit-month at a
+time, into HabitLogArchive rows (packed statuses plus the non-empty
+reflections) by the archive_habit_logs command, which keeps the hot table and
+its indexes small.
+
+Every (habit, day) lives in exactly one tier: a write to a day in an archived
+month first moves that month back to HabitLog (restore()), so readers simply
+union both tiers with cold_logs().
+"""
+
+import calendar
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Habit, HabitLog, HabitLogArchive
+from .packing import CODE_STATUSES, STATUS_CODES, pack_codes, unpack_codes
+
+DEFAULT_HOT_DAYS = 400
+MIN_HOT_DAYS = 60  # counters read their 30-day windows from the hot table only
+CHUNK_SIZE = 200   # habits per archiving transaction
+
+
+def hot_days():
+    return max(MIN_HOT_DAYS, getattr(settings, "HABIT_LOG_HOT_DAYS", DEFAULT_HOT_DAYS))
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _month_length(month):
+    return calendar.monthrange(month.year, month.month)[1]
+
+
+def _boundary(today):
+    """Archived months always start before this, whatever horizon the job ran with."""
+    return month_start(today - timedelta(days=MIN_HOT_DAYS))
+
+
+def _entries(month, statuses, reflections):
+    """(date, status, reflection) for each non-empty day of one archived month."""
+    codes = unpack_codes(statuses, _month_length(month))
+    days = set(np.flatnonzero(codes).tolist()) | {int(d) - 1 for d in reflections}
+    for index in sorted(days):
+        yield (
+            month + timedelta(days=index),
+            CODE_STATUSES[int(codes[index])],
+            reflections.get(str(index + 1), ""),
+        )
+
+
+def cold_logs(habit_ids=None, user_id=None, start=None, end=None, descending=False):
+    """
+    (habit_id, date, status, reflection) from the archive, ordered by habit
+    then date (newest first with descending=True), optionally within [start, end].
+    Includes days whose status is "none" but that kept a reflection.
+    Ranges starting in recent months can't reach the archive and cost no query.
+    """
+    if start and start >= _boundary(timezone.localdate()):
+        return
+    rows = HabitLogArchive.objects.all()
+    if habit_ids is not None:
+        rows = rows.filter(habit_id__in=habit_ids)
+    if user_id is not None:
+        rows = rows.filter(user_id=user_id)
+    if start:
+        rows = rows.filter(month__gte=month_start(start))
+    if end:
+        rows = rows.filter(month__lte=end)
+
+    order = ("habit_id", "-month") if descending else ("habit_id", "month")
+    rows = rows.order_by(*order).values_list("habit_id", "month", "statuses", "reflections")
+    for habit_id, month, statuses, reflections in rows.iterator(chunk_size=100):
+        entries = list(_entries(month, statuses, reflections))
+        for day, status, reflection in reversed(entries) if descending else entries:
+            if (start and day < start) or (end and day > end):
+                continue
+            yield habit_id, day, status, reflection
+
+
+def cold_log(habit, day):
+    """Unsaved HabitLog for an archived day (for display), or None."""
+    if day >= _boundary(timezone.localdate()):
+        return None
+    for _, _, status, reflection in cold_logs(habit_ids=[habit.id], start=day, end=day):
+        return HabitLog(user_id=habit.user_id, habit=habit, date=day, status=status, reflection=reflection)
+    return None
+
+
+def restore(pairs, today=None):
+    """
+    Move the archived months holding any of the (habit_id, day) pairs back
+    into HabitLog, so the caller can write to those days. Days in recent
+    months can't be archived and cost no query. Returns months restored.
+    """
+    boundary = _boundary(today or timezone.localdate())
+    keys = {(habit_id, month_start(day)) for habit_id, day in pairs if day < boundary}
+    if not keys:
+        return 0
+
+    match = Q()
+    for habit_id, month in keys:
+        match |= Q(habit_id=habit_id, month=month)
+
+    with transaction.atomic():
+        archived = list(HabitLogArchive.objects.select_for_update().filter(match))
+        for row in archived:
+            HabitLog.objects.bulk_create(
+                [
+                    HabitLog(user_id=row.user_id, habit_id=row.habit_id, date=day, status=status, reflection=reflection)
+                    for day, status, reflection in _entries(row.month, row.statuses, row.reflections)
+                ],
+                ignore_conflicts=True,
+            )
+            # keep last-write-wins comparisons honest: restored rows are as old as the archive
+            HabitLog.objects.filter(
+                habit_id=row.habit_id, date__gte=row.month, date__lt=row.month + timedelta(days=_month_length(row.month)),
+            ).update(created_at=row.archived_at, updated_at=row.archived_at)
+        HabitLogArchive.objects.filter(id__in=[row.id for row in archived]).delete()
+    return len(archived)
+
+
+def _pack_month(month, entries, existing=None):
+    """(statuses bytes, reflections) for one habit-month; hot entries win over `existing`."""
+    length = _month_length(month)
+    if existing:
+        codes = unpack_codes(existing.statuses, length).copy()
+        reflections = dict(existing.reflections)
+    else:
+        codes = np.zeros(length, dtype=np.uint8)
+        reflections = {}
+
+    for day, status, reflection in entries:
+        codes[day.day - 1] = STATUS_CODES[status]
+        if reflection:
+            reflections[str(day.day)] = reflection
+        else:
+            reflections.pop(str(day.day), None)
+    return pack_codes(codes[None, :])[0].tobytes(), reflections, bool(codes.any() or reflections)
+
+
+def archive_before(cutoff, chunk_size=CHUNK_SIZE):
+    """
+    Move every HabitLog dated before `cutoff` (a month start) into the
+    archive, chunk_size habits per transaction. Returns (months, logs) moved.
+    """
+    months = logs = 0
+    last_id = 0
+
+    while True:
+        habit_ids = list(
+            Habit.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not habit_ids:
+            break
+        last_id = habit_ids[-1]
+
+        with transaction.atomic():
+            old = HabitLog.objects.filter(habit_id__in=habit_ids, date__lt=cutoff)
+            grouped = {}
+            for user_id, habit_id, day, status, reflection in (
+                old.order_by("habit_id", "date")
+                .values_list("user_id", "habit_id", "date", "status", "reflection")
+                .iterator(chunk_size=2000)
+            ):
+                grouped.setdefault((habit_id, month_start(day)), (user_id, []))[1].append((day, status, reflection))
+            if not grouped:
+                continue
+
+            existing = {
+                (row.habit_id, row.month): row
+                for row in HabitLogArchive.objects.select_for_update().filter(habit_id__in=habit_ids, month__lt=cutoff)
+            }
+            rows = []
+            for (habit_id, month), (user_id, entries) in grouped.items():
+                statuses, reflections, has_data = _pack_month(month, entries, existing.get((habit_id, month)))
+                if has_data:
+                    rows.append(HabitLogArchive(
+                        user_id=user_id, habit_id=habit_id, month=month, statuses=statuses, reflections=reflections,
+                    ))
+                logs += len(entries)
+
+            HabitLogArchive.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["habit", "month"],
+                update_fields=["statuses", "reflections", "archived_at"],
+            )
+            # plain DELETE rather than old.delete(), which would load every row to send
+            # post_delete (refreshing DaySummary per row); the data is unchanged, only
+            # its tier moved, so DaySummary, counters and the calendar stay valid
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(HabitLog._meta.db_table)} "
+                    f"WHERE habit_id IN ({', '.join(['%s'] * len(habit_ids))}) AND date < %s",
+                    [*habit_ids, cutoff],
+                )
+            months += len(rows)
+
+    return months, logs
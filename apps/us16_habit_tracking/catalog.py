@@ -0,0 +1,69 @@
+"""
+In-process catalog of the Bloom habit library (HabitTemplate).
+
+The library is small and nearly static, so each worker loads the active
+templates once into an immutable Catalog (grouped by category, indexed by id
+and slug) and serves every request from it. Saving or deleting a template
+bumps the HabitCatalogVersion row (core/signals.py), which reloads it (see
+core/versioned.py).
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from core.versioned import VersionedCache
+
+from .models import HabitCatalogVersion, HabitTemplate
+
+TemplateEntry = namedtuple("TemplateEntry", ["id", "slug", "name", "intention", "category", "sort_order"])
+
+
+class Catalog:
+    """Read-only snapshot of the active templates at one catalog version."""
+
+    __slots__ = ("version", "templates", "by_id", "by_slug", "by_category")
+
+    def __init__(self, version, templates):
+        self.version = version
+        self.templates = tuple(templates)
+        self.by_id = MappingProxyType({t.id: t for t in self.templates})
+        self.by_slug = MappingProxyType({t.slug: t for t in self.templates})
+
+        grouped = {}
+        for t in self.templates:
+            grouped.setdefault(t.category or "Other", []).append(t)
+        self.by_category = MappingProxyType({name: tuple(items) for name, items in grouped.items()})
+
+    def __len__(self):
+        return len(self.templates)
+
+    def grouped_excluding(self, template_ids):
+        """{category: [entries]} without the given template ids; empty categories dropped."""
+        result = {}
+        for category, items in self.by_category.items():
+            remaining = [t for t in items if t.id not in template_ids]
+            if remaining:
+                result[category] = remaining
+        return result
+
+
+def _load(version):
+    rows = (
+        HabitTemplate.objects.filter(is_active=True)
+        .order_by("sort_order", "name")
+        .values_list(*TemplateEntry._fields)
+    )
+    return Catalog(version, (TemplateEntry(*row) for row in rows))
+
+
+_catalog = VersionedCache(HabitCatalogVersion, _load)
+
+
+def get_catalog():
+    """The worker's catalog, reloaded if the version row has moved since the last check."""
+    return _catalog.get()
+
+
+def bump_version():
+    """Invalidate every worker's catalog; this worker reloads on its next read."""
+    _catalog.bump()
@@ -0,0 +1,211 @@
+"""
+Denormalized progress counters on Habit (streaks, 7/30-day ratios, last
+logged day).
+
+update_after_change() runs inside the toggle's transaction and only touches
+the rows it needs: the last 30 days for the ratios, and the runs of
+consecutive days around the changed day for the streaks. Only breaking what
+was the longest streak falls back to a full pass over that one habit.
+rebuild() recomputes everything in bulk (see the rebuild_habit_counters command).
+Stored ratios describe the windows ending on counters_date; pages showing
+them use ratios_as_of() to move them onto today.
+Streak reads cover both the hot table and the archive (archive.py); the 7/30
+day windows are always hot.
+"""
+
+import heapq
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q
+
+from . import archive
+from .models import Habit, HabitLog
+
+SHOWED_UP = (HabitLog.Status.DONE, HabitLog.Status.PARTIAL)
+COUNTER_FIELDS = [
+    "current_streak", "streak_end", "longest_streak",
+    "done_ratio_7", "partial_ratio_7", "done_ratio_30", "partial_ratio_30",
+    "last_logged_date", "counters_date",
+]
+RUN_FETCH_SIZE = 64
+
+
+def _showed_up_days(habit_id, start=None, step=1):
+    """Showed-up days from both tiers, from `start` going back (step=-1) or forward (step=1)."""
+    logs = HabitLog.objects.filter(habit_id=habit_id, status__in=SHOWED_UP)
+    if step < 0:
+        logs = logs.filter(date__lte=start).order_by("-date")
+        cold = archive.cold_logs(habit_ids=[habit_id], end=start, descending=True)
+    else:
+        logs = logs.filter(date__gte=start).order_by("date") if start else logs.order_by("date")
+        cold = archive.cold_logs(habit_ids=[habit_id], start=start)
+
+    hot = logs.values_list("date", flat=True).iterator(chunk_size=RUN_FETCH_SIZE)
+    return heapq.merge(hot, (day for _, day, status, _ in cold if status in SHOWED_UP), reverse=step < 0)
+
+
+def _run_length(habit_id, start, step):
+    """Consecutive showed-up days from `start` going back (step=-1) or forward (step=1)."""
+    expected, length = start, 0
+    # stops reading at the first gap
+    for day in _showed_up_days(habit_id, start, step):
+        if day != expected:
+            break
+        length += 1
+        expected += timedelta(days=step)
+    return length
+
+
+def _window_counts(today):
+    """Aggregates for the done/partial counts in the 7 and 30 days ending on `today`."""
+    week = Q(date__gt=today - timedelta(days=7))
+    return {
+        "done_30": Count("id", filter=Q(status=HabitLog.Status.DONE)),
+        "partial_30": Count("id", filter=Q(status=HabitLog.Status.PARTIAL)),
+        "done_7": Count("id", filter=Q(status=HabitLog.Status.DONE) & week),
+        "partial_7": Count("id", filter=Q(status=HabitLog.Status.PARTIAL) & week),
+    }
+
+
+def _window(today):
+    return HabitLog.objects.filter(date__gt=today - timedelta(days=30), date__lte=today)
+
+
+def _apply_ratios(habit, counts, today):
+    habit.done_ratio_7 = round(counts["done_7"] / 7, 3)
+    habit.partial_ratio_7 = round(counts["partial_7"] / 7, 3)
+    habit.done_ratio_30 = round(counts["done_30"] / 30, 3)
+    habit.partial_ratio_30 = round(counts["partial_30"] / 30, 3)
+    habit.counters_date = today
+
+
+def _set_window_ratios(habit, today):
+    _apply_ratios(habit, _window(today).filter(habit_id=habit.id).aggregate(**_window_counts(today)), today)
+
+
+def ratios_as_of(habits, today):
+    """
+    Move the 7/30-day ratios of habits last counted before `today` onto
+    today's windows, in memory only (one grouped query, none if all are
+    current), the way Habit.streak_as_of() handles the streak. The stored
+    counters are left to the next status change, which saves under the
+    toggle's row lock. Returns the habits.
+    """
+    stale = {habit.id: habit for habit in habits if habit.counters_date != today}
+    if not stale:
+        return habits
+
+    rows = (
+        _window(today).filter(habit_id__in=stale)
+        .order_by()  # no default ordering in the GROUP BY
+        .values("habit_id")
+        .annotate(**_window_counts(today))
+    )
+    counts = {row["habit_id"]: row for row in rows}
+    empty = dict.fromkeys(_window_counts(today), 0)
+    for habit_id, habit in stale.items():
+        _apply_ratios(habit, counts.get(habit_id, empty), today)
+    return habits
+
+
+def _set_current_streak(habit, today):
+    # not having logged today yet doesn't end a streak
+    for end in (today, today - timedelta(days=1)):
+        length = _run_length(habit.id, end, -1)
+        if length:
+            habit.current_streak, habit.streak_end = length, end
+            return
+    habit.current_streak, habit.streak_end = 0, None
+
+
+def _longest_streak(habit_id):
+    longest = run = 0
+    previous = None
+    for day in _showed_up_days(habit_id):
+        run = run + 1 if previous and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    return longest
+
+
+def update_after_change(habit, day, old_status, new_status, today):
+    """Adjust habit's counters after the log for `day` went old_status -> new_status, then save them."""
+    was_up, is_up = old_status in SHOWED_UP, new_status in SHOWED_UP
+
+    if was_up != is_up:
+        # the run through `day` after the change (or, for a break, before it)
+        run = _run_length(habit.id, day - timedelta(days=1), -1) + 1 + _run_length(habit.id, day + timedelta(days=1), 1)
+        if is_up:
+            habit.longest_streak = max(habit.longest_streak, run)
+        elif run >= habit.longest_streak:
+            habit.longest_streak = _longest_streak(habit.id)
+        _set_current_streak(habit, today)
+
+    if new_status != HabitLog.Status.NONE:
+        habit.last_logged_date = max(habit.last_logged_date or day, day)
+    elif habit.last_logged_date == day:
+        hot_last = (
+            HabitLog.objects.filter(habit_id=habit.id).exclude(status=HabitLog.Status.NONE)
+            .aggregate(last=Max("date"))["last"]
+        )
+        cold_last = next(
+            (d for _, d, status, _ in archive.cold_logs(habit_ids=[habit.id], descending=True)
+             if status != HabitLog.Status.NONE),
+            None,
+        )
+        habit.last_logged_date = max(filter(None, [hot_last, cold_last]), default=None)
+
+    _set_window_ratios(habit, today)
+    habit.save(update_fields=COUNTER_FIELDS)
+
+
+def rebuild(habits, today):
+    """
+    Recompute counters for `habits` from their full history: one streaming
+    query over their logs, then one bulk_update. Returns the habits.
+    """
+    by_id = {habit.id: habit for habit in habits}
+    state = {habit_id: {"run": 0, "longest": 0, "prev": None, "last": None, "counts": [0, 0, 0, 0]}
+             for habit_id in by_id}
+
+    hot = (
+        HabitLog.objects.filter(habit_id__in=by_id)
+        .exclude(status=HabitLog.Status.NONE)
+        .order_by("habit_id", "date")
+        .values_list("habit_id", "date", "status")
+    )
+    cold = (
+        (habit_id, day, status)
+        for habit_id, day, status, _ in archive.cold_logs(habit_ids=list(by_id))
+        if status != HabitLog.Status.NONE
+    )
+    for habit_id, day, status in heapq.merge(hot.iterator(chunk_size=2000), cold):
+        s = state[habit_id]
+        s["last"] = day
+        if status in SHOWED_UP:
+            s["run"] = s["run"] + 1 if s["prev"] and (day - s["prev"]).days == 1 else 1
+            s["longest"] = max(s["longest"], s["run"])
+            s["prev"] = day
+        age = (today - day).days
+        if 0 <= age < 30:
+            done = status == HabitLog.Status.DONE
+            partial = status == HabitLog.Status.PARTIAL
+            s["counts"][2] += done
+            s["counts"][3] += partial
+            if age < 7:
+                s["counts"][0] += done
+                s["counts"][1] += partial
+
+    for habit_id, s in state.items():
+        habit = by_id[habit_id]
+        habit.longest_streak = s["longest"]
+        # the final run is the current one if it reaches today or yesterday
+        if s["prev"] and (today - s["prev"]).days <= 1 and s["prev"] <= today:
+            habit.current_streak, habit.streak_end = s["run"], s["prev"]
+        else:
+            habit.current_streak, habit.streak_end = 0, None
+        _apply_ratios(habit, dict(zip(["done_7", "partial_7", "done_30", "partial_30"], s["counts"])), today)
+        habit.last_logged_date = s["last"]
+
+    Habit.objects.bulk_update(list(by_id.values()), COUNTER_FIELDS)
+    return habits
@@ -0,0 +1,144 @@
+"""
+Writing HabitLog rows.
+
+Logs are created lazily: the Today page renders "No entry" for habits without
+a row, and a row only appears once the user actually sets a status. Writes are
+a single INSERT ... ON CONFLICT(habit, date) DO UPDATE, so two tabs toggling
+the same habit can't trip the unique constraint. Writes to a day in an
+archived month move that month back to the hot table first (archive.restore).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from core import summaries
+
+from . import archive, counters, rollups
+from .models import Habit, HabitLog
+
+
+def upsert_status(user, habit_id, day, status):
+    """
+    Set the status of habit_id on day, creating the log row if needed, and
+    update the habit's counters in the same transaction.
+    Raises Habit.DoesNotExist if the habit isn't the user's.
+    """
+    with transaction.atomic():
+        # row lock serializes concurrent toggles of one habit (counters read-modify-write)
+        habit = Habit.objects.select_for_update().get(id=habit_id, user=user)
+        archive.restore([(habit_id, day)])
+        old_status = (
+            HabitLog.objects.filter(habit_id=habit_id, date=day)
+            .values_list("status", flat=True).first()
+        ) or HabitLog.Status.NONE
+
+        HabitLog.objects.bulk_create(
+            [HabitLog(user=user, habit_id=habit_id, date=day, status=status)],
+            update_conflicts=True,
+            unique_fields=["habit", "date"],
+            update_fields=["status", "updated_at"],
+        )
+        counters.update_after_change(habit, day, old_status, status, timezone.localdate())
+        rollups.apply_changes([(user.id, habit_id, day, old_status, status)])
+        # bulk_create sends no post_save, so keep DaySummary in step by hand
+        summaries.refresh_days(user.id, [day])
+
+    return habit
+
+
+def _update_counters(habits, changes, today):
+    """
+    Counters after a batch, once per affected habit. A habit with a single
+    change gets the same incremental update as a toggle; several changes to
+    one habit can break the same run twice, which the incremental longest
+    streak can't follow against the final rows, so those habits get one
+    bulk rebuild.
+    """
+    by_habit = {}
+    for _, habit_id, day, old_status, new_status in changes:
+        by_habit.setdefault(habit_id, []).append((day, old_status, new_status))
+
+    several = []
+    for habit_id, habit_changes in by_habit.items():
+        if len(habit_changes) == 1:
+            counters.update_after_change(habits[habit_id], *habit_changes[0], today)
+        else:
+            several.append(habits[habit_id])
+    if several:
+        counters.rebuild(several, today)
+
+
+def apply_batch(user, ops, today):
+    """
+    Apply many status changes in one transaction (offline queues, rapid tapping).
+
+    ops: list of {"habit_id", "date", "status", "updated_at"} with parsed values;
+    updated_at (aware datetime or None) is when the client made the change,
+    and becomes the row's updated_at (server time when missing or ahead).
+    Last write wins: an op older than the stored row's updated_at is reported
+    as "stale" and not applied. Later ops for the same habit/day win over
+    earlier ones in the batch.
+
+    Returns one result dict per op, in order.
+    """
+    results = [None] * len(ops)
+    now = timezone.now()
+
+    with transaction.atomic():
+        habit_ids = {op["habit_id"] for op in ops}
+        habits = {
+            habit.id: habit
+            for habit in Habit.objects.select_for_update().filter(user=user, id__in=habit_ids)
+        }
+
+        # last op per (habit, date) wins inside the batch
+        latest = {}
+        for index, op in enumerate(ops):
+            if op["habit_id"] not in habits:
+                results[index] = {"ok": False, "error": "unknown habit"}
+                continue
+            key = (op["habit_id"], op["date"])
+            if key in latest:
+                results[latest[key]] = {"ok": True, "result": "superseded"}
+            latest[key] = index
+
+        stored = {}
+        if latest:
+            archive.restore(latest, today)
+            days = {day for _, day in latest}
+            existing = HabitLog.objects.filter(
+                habit_id__in={habit_id for habit_id, _ in latest}, date__in=days,
+            ).values_list("habit_id", "date", "status", "updated_at")
+            stored = {(habit_id, day): (status, updated_at) for habit_id, day, status, updated_at in existing}
+
+        written, stamps, changes = [], [], []
+        for key, index in latest.items():
+            op = ops[index]
+            current = stored.get(key)
+            if current and op["updated_at"] and op["updated_at"] < current[1]:
+                results[index] = {"ok": True, "result": "stale", "status": current[0]}
+                continue
+
+            old_status = current[0] if current else HabitLog.Status.NONE
+            written.append(HabitLog(user=user, habit_id=op["habit_id"], date=op["date"], status=op["status"]))
+            stamps.append(min(op["updated_at"] or now, now))  # clocks ahead are capped
+            changes.append((user.id, op["habit_id"], op["date"], old_status, op["status"]))
+            results[index] = {"ok": True, "result": "applied", "status": op["status"]}
+
+        if written:
+            HabitLog.objects.bulk_create(
+                written,
+                update_conflicts=True,
+                unique_fields=["habit", "date"],
+                update_fields=["status", "updated_at"],
+            )
+            # stamp the rows with when the client made the change, so later batches
+            # compare against it (auto_now set server time)
+            for log, stamp in zip(written, stamps):
+                log.updated_at = stamp
+            HabitLog.objects.bulk_update(written, ["updated_at"])
+            _update_counters(habits, changes, today)
+            rollups.apply_changes(changes)
+            summaries.refresh_days(user.id, {log.date for log in written})
+
+    return results
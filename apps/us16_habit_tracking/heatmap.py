@@ -0,0 +1,61 @@
+"""
+Year heatmap for habits, bit-packed.
+
+Every HabitLog.Status fits in 2 bits, so a habit's day-by-day history is
+packed 4 days per byte (365 days -> 92 bytes); see packing.py for the layout.
+static/js/components/habit-heatmap.js decodes it.
+"""
+
+from base64 import b64encode
+from itertools import chain
+
+import numpy as np
+
+from core.querysets import ONE_DAY
+
+from . import archive
+from .models import Habit, HabitLog
+from .packing import STATUS_CODES, pack_codes
+
+
+def build_heatmap(user, start, end):
+    """
+    All of the user's habits for [start, end]: one range query over HabitLog
+    plus one over the archive when the range reaches archived months.
+    """
+    habits = list(Habit.objects.filter(user=user).values_list("id", "name", "is_active"))
+    num_days = (end - start).days + 1
+    row_of = {habit_id: row for row, (habit_id, _, _) in enumerate(habits)}
+
+    logs = (
+        HabitLog.objects.for_user_range(user, start, end + ONE_DAY)
+        .exclude(status=HabitLog.Status.NONE)
+        .order_by()  # cells are placed by index; the default ordering would join Habit and sort
+        .values_list("habit_id", "date", "status")
+    )
+    cold = (
+        (habit_id, day, status)
+        for habit_id, day, status, _ in archive.cold_logs(user_id=user.id, start=start, end=end)
+        if status != HabitLog.Status.NONE
+    )
+    rows, cols, values = [], [], []
+    for habit_id, day, status in chain(logs, cold):
+        rows.append(row_of[habit_id])
+        cols.append((day - start).days)
+        values.append(STATUS_CODES[status])
+
+    codes = np.zeros((len(habits), num_days), dtype=np.uint8)
+    codes[rows, cols] = values
+    packed = pack_codes(codes)
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": num_days,
+        "codes": {status.value: code for status, code in STATUS_CODES.items()},
+        "habits": [
+            {"id": habit_id, "name": name, "is_active": is_active, "bits": b64encode(packed[row].tobytes()).decode("ascii")}
+            for row, (habit_id, name, is_active) in enumerate(habits)
+        ],
+    }
+
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.us16_habit_tracking import archive
+
+
+class Command(BaseCommand):
+    help = "Move HabitLog rows older than HABIT_LOG_HOT_DAYS into per-habit-month archive rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Override HABIT_LOG_HOT_DAYS.")
+        parser.add_argument("--chunk-size", type=int, default=archive.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        days = options["days"] or archive.hot_days()
+        if days < archive.MIN_HOT_DAYS:
+            raise CommandError(f"--days must be at least {archive.MIN_HOT_DAYS}.")
+
+        # whole months only, so a month is never split across the tiers
+        cutoff = archive.month_start(timezone.localdate() - timedelta(days=days))
+        months, logs = archive.archive_before(cutoff, options["chunk_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {logs} logs into {months} habit-months (before {cutoff.isoformat()})."
+        ))
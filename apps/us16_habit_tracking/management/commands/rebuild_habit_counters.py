@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.us16_habit_tracking import counters
+from apps.us16_habit_tracking.models import Habit
+
+
+class Command(BaseCommand):
+    help = "Recompute streak/ratio counters on every Habit from its HabitLog history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        last_id = total = 0
+
+        while True:
+            habits = list(Habit.objects.filter(id__gt=last_id).order_by("id")[:options["chunk_size"]])
+            if not habits:
+                break
+            counters.rebuild(habits, today)
+            total += len(habits)
+            last_id = habits[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {total} habits."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.us16_habit_tracking import rollups
+from apps.us16_habit_tracking.models import Habit
+
+
+class Command(BaseCommand):
+    help = "Backfill weekly/monthly HabitRollup rows from every Habit's log history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        last_id = habits_done = rows = 0
+
+        while True:
+            habits = list(Habit.objects.filter(id__gt=last_id).order_by("id")[:options["chunk_size"]])
+            if not habits:
+                break
+            rows += rollups.rebuild(habits)
+            habits_done += len(habits)
+            last_id = habits[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} rollups for {habits_done} habits."))
@@ -0,0 +1,116 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BACKFILL_CHUNK = 500
+SHOWED_UP = ("done", "partial")
+
+
+def backfill_counters(apps, schema_editor):
+    # the same pass as counters.rebuild(), on the historical models (no archive tier yet)
+    Habit = apps.get_model("us16_habit_tracking", "Habit")
+    HabitLog = apps.get_model("us16_habit_tracking", "HabitLog")
+    today = timezone.localdate()
+    last_id = 0
+    while True:
+        habits = {h.id: h for h in Habit.objects.filter(id__gt=last_id).order_by("id")[:BACKFILL_CHUNK]}
+        if not habits:
+            break
+        logs = (
+            HabitLog.objects.filter(habit_id__in=habits).exclude(status="none")
+            .order_by("habit_id", "date").values_list("habit_id", "date", "status")
+        )
+        state = {habit_id: {"run": 0, "longest": 0, "prev": None, "last": None, "counts": [0, 0, 0, 0]}
+                 for habit_id in habits}
+        for habit_id, day, status in logs.iterator(chunk_size=2000):
+            s = state[habit_id]
+            s["last"] = day
+            if status in SHOWED_UP:
+                s["run"] = s["run"] + 1 if s["prev"] and (day - s["prev"]).days == 1 else 1
+                s["longest"] = max(s["longest"], s["run"])
+                s["prev"] = day
+            age = (today - day).days
+            if 0 <= age < 30:
+                s["counts"][2] += status == "done"
+                s["counts"][3] += status == "partial"
+                if age < 7:
+                    s["counts"][0] += status == "done"
+                    s["counts"][1] += status == "partial"
+
+        for habit_id, s in state.items():
+            habit = habits[habit_id]
+            habit.longest_streak = s["longest"]
+            if s["prev"] and s["prev"] <= today and (today - s["prev"]).days <= 1:
+                habit.current_streak, habit.streak_end = s["run"], s["prev"]
+            else:
+                habit.current_streak, habit.streak_end = 0, None
+            done_7, partial_7, done_30, partial_30 = s["counts"]
+            habit.done_ratio_7 = round(done_7 / 7, 3)
+            habit.partial_ratio_7 = round(partial_7 / 7, 3)
+            habit.done_ratio_30 = round(done_30 / 30, 3)
+            habit.partial_ratio_30 = round(partial_30 / 30, 3)
+            habit.last_logged_date = s["last"]
+            habit.counters_date = today
+        Habit.objects.bulk_update(habits.values(), [
+            "current_streak", "streak_end", "longest_streak",
+            "done_ratio_7", "partial_ratio_7", "done_ratio_30", "partial_ratio_30",
+            "last_logged_date", "counters_date",
+        ])
+        last_id = max(habits)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0005_alter_habit_id_alter_habitlog_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='counters_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='done_ratio_30',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='done_ratio_7',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='last_logged_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='partial_ratio_30',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='partial_ratio_7',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='streak_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0006_habit_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitCatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def unlink_duplicate_library_habits(apps, schema_editor):
+    """
+    Older get_or_create races could add the same template twice. Keep the
+    first habit linked and turn the rest into custom habits (logs are kept).
+    """
+    Habit = apps.get_model("us16_habit_tracking", "Habit")
+    seen = set()
+    duplicates = []
+    rows = Habit.objects.exclude(template__isnull=True).order_by("id").values_list("id", "user_id", "template_id")
+    for habit_id, user_id, template_id in rows.iterator():
+        if (user_id, template_id) in seen:
+            duplicates.append(habit_id)
+        seen.add((user_id, template_id))
+    if duplicates:
+        Habit.objects.filter(id__in=duplicates).update(template=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0007_habitcatalogversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(unlink_duplicate_library_habits, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='habit',
+            constraint=models.UniqueConstraint(fields=('user', 'template'), name='us16_habit_user_template_uniq'),
+        ),
+    ]
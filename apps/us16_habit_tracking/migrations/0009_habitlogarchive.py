@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0008_habit_user_template_uniq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('statuses', models.BinaryField()),
+                ('reflections', models.JSONField(blank=True, default=dict)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_months', to='us16_habit_tracking.habit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habit_log_archives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'month'], name='us16_hlarchive_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('habit', 'month'), name='us16_habitlogarchive_habit_month_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:00
+
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_CHUNK = 500
+COUNTED = ("done", "partial", "not_today")
+ARCHIVE_CODES = {1: "not_today", 2: "partial", 3: "done"}  # packing.STATUS_CODES, frozen here
+
+
+def _archived_days(row):
+    """(day, status) of one archived month: day i in byte i // 4 at bit 2 * (i % 4)."""
+    for index, byte in enumerate(bytes(row.statuses)):
+        for slot in range(4):
+            status = ARCHIVE_CODES.get((byte >> (2 * slot)) & 3)
+            if status:
+                yield row.month + timedelta(days=index * 4 + slot), status
+
+
+def backfill_rollups(apps, schema_editor):
+    # existing logs need their counts before toggles start applying deltas to them;
+    # the same counts as rollups.rebuild(), on the historical models
+    Habit = apps.get_model("us16_habit_tracking", "Habit")
+    HabitLog = apps.get_model("us16_habit_tracking", "HabitLog")
+    HabitLogArchive = apps.get_model("us16_habit_tracking", "HabitLogArchive")
+    HabitRollup = apps.get_model("us16_habit_tracking", "HabitRollup")
+
+    last_id = 0
+    while True:
+        owners = dict(
+            Habit.objects.filter(id__gt=last_id).order_by("id").values_list("id", "user_id")[:BACKFILL_CHUNK]
+        )
+        if not owners:
+            break
+        last_id = max(owners)
+
+        hot = (
+            HabitLog.objects.filter(habit_id__in=owners, status__in=COUNTED)
+            .order_by().values_list("habit_id", "date", "status").iterator(chunk_size=2000)
+        )
+        cold = (
+            (row.habit_id, day, status)
+            for row in HabitLogArchive.objects.filter(habit_id__in=owners).order_by().iterator(chunk_size=200)
+            for day, status in _archived_days(row)
+        )
+        counts = defaultdict(lambda: {"done": 0, "partial": 0, "not_today": 0})
+        for habit_id, day, status in chain(hot, cold):
+            counts[(habit_id, "week", day - timedelta(days=day.weekday()))][status] += 1
+            counts[(habit_id, "month", day.replace(day=1))][status] += 1
+
+        HabitRollup.objects.bulk_create(
+            [
+                HabitRollup(user_id=owners[habit_id], habit_id=habit_id, period_kind=kind, period_start=start, **fields)
+                for (habit_id, kind, start), fields in counts.items()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0009_habitlogarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_kind', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('done', models.PositiveSmallIntegerField(default=0)),
+                ('partial', models.PositiveSmallIntegerField(default=0)),
+                ('not_today', models.PositiveSmallIntegerField(default=0)),
+                ('habit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='us16_habit_tracking.habit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='habit_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'period_kind', 'period_start'], name='us16_rollup_user_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('habit', 'period_kind', 'period_start'), name='us16_habitrollup_period_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('us16_habit_tracking', '0010_habitrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='habitlog',
+            index=models.Index(fields=['user', 'date'], name='us16_habitlog_user_date_idx'),
+        ),
+    ]
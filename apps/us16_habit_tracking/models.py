@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from core.querysets import DayQuerySet
+
 
 class HabitTemplate(models.Model):
     slug = models.SlugField(unique=True)
@@ -18,6 +20,18 @@ class HabitTemplate(models.Model):
         return self.name
 
 
+class HabitCatalogVersion(models.Model):
+    """
+    Single row whose number goes up whenever a HabitTemplate is saved or
+    deleted; workers compare it against their cached catalog (see catalog.py).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Habit catalog v{self.version}"
+
+
 class Habit(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -39,12 +53,35 @@ class Habit(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Progress counters kept up to date by counters.py on every status change.
+    # A streak counts consecutive days marked Done or A little; the ratios
+    # cover the 7/30 days ending on counters_date.
+    current_streak = models.PositiveIntegerField(default=0)
+    streak_end = models.DateField(null=True, blank=True)
+    longest_streak = models.PositiveIntegerField(default=0)
+    done_ratio_7 = models.FloatField(default=0)
+    partial_ratio_7 = models.FloatField(default=0)
+    done_ratio_30 = models.FloatField(default=0)
+    partial_ratio_30 = models.FloatField(default=0)
+    last_logged_date = models.DateField(null=True, blank=True)
+    counters_date = models.DateField(null=True, blank=True)
+
     class Meta:
         ordering = ["-is_active", "name"]
+        constraints = [
+            # custom habits have no template; NULLs never conflict
+            models.UniqueConstraint(fields=["user", "template"], name="us16_habit_user_template_uniq"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    def streak_as_of(self, day) -> int:
+        """current_streak, or 0 once a whole day has passed since the streak's last day."""
+        if self.streak_end and (day - self.streak_end).days <= 1:
+            return self.current_streak
+        return 0
+
 
 class HabitLog(models.Model):
     class Status(models.TextChoices):
@@ -70,9 +107,90 @@ class HabitLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DayQuerySet.as_manager()
+
     class Meta:
         unique_together = ("habit", "date")
         ordering = ["-date", "habit__name"]
+        indexes = [
+            # (habit, date) is unique; per-user day and range reads need their own index
+            models.Index(fields=["user", "date"], name="us16_habitlog_user_date_idx"),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.habit.name} · {self.date} · {self.status}"
\ No newline at end of file
+        return f"{self.habit.name} · {self.date} · {self.status}"
+
+class HabitLogArchive(models.Model):
+    """
+    One habit-month of HabitLog rows moved out of the hot table by the
+    archive_habit_logs command (see archive.py). Statuses are 2-bit codes,
+    day 1 first (packing.py); reflections only for days that had one.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="habit_log_archives",
+    )
+    habit = models.ForeignKey(
+        Habit,
+        on_delete=models.CASCADE,
+        related_name="archived_months",
+    )
+    month = models.DateField()  # first day of the month
+    statuses = models.BinaryField()
+    reflections = models.JSONField(default=dict, blank=True)  # {"day of month": text}
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["habit", "month"], name="us16_habitlogarchive_habit_month_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "month"], name="us16_hlarchive_user_month_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.habit_id} · {self.month:%Y-%m} (archived)"
+
+
+class HabitRollup(models.Model):
+    """
+    Per-habit counts for one week (Monday start) or calendar month, kept up
+    to date on every status change (see rollups.py).
+    """
+    class PeriodKind(models.TextChoices):
+        WEEK = "week", "Week"
+        MONTH = "month", "Month"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="habit_rollups",
+    )
+    habit = models.ForeignKey(
+        Habit,
+        on_delete=models.CASCADE,
+        related_name="rollups",
+    )
+    period_kind = models.CharField(max_length=5, choices=PeriodKind.choices)
+    period_start = models.DateField()
+    done = models.PositiveSmallIntegerField(default=0)
+    partial = models.PositiveSmallIntegerField(default=0)
+    not_today = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["habit", "period_kind", "period_start"], name="us16_habitrollup_period_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "period_kind", "period_start"], name="us16_rollup_user_period_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.habit_id} · {self.period_kind} of {self.period_start}"
+
+    @property
+    def showed_up(self) -> int:
+        return self.done + self.partial
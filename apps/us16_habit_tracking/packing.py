@@ -0,0 +1,35 @@
+"""
+2-bit status codes shared by the heatmap API and the HabitLog archive.
+
+Every HabitLog.Status fits in 2 bits, so day i of a run of days lives in
+byte i // 4 at bit offset 2 * (i % 4).
+"""
+
+import numpy as np
+
+from .models import HabitLog
+
+STATUS_CODES = {
+    HabitLog.Status.NONE: 0,
+    HabitLog.Status.NOT_TODAY: 1,
+    HabitLog.Status.PARTIAL: 2,
+    HabitLog.Status.DONE: 3,
+}
+CODE_STATUSES = {code: status.value for status, code in STATUS_CODES.items()}
+
+
+def pack_codes(codes):
+    """(rows, days) array of 2-bit codes -> (rows, ceil(days / 4)) uint8 array."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    pad = (-codes.shape[1]) % 4
+    if pad:
+        codes = np.pad(codes, ((0, 0), (0, pad)))
+    quads = codes.reshape(codes.shape[0], codes.shape[1] // 4, 4)
+    return quads[..., 0] | (quads[..., 1] << 2) | (quads[..., 2] << 4) | (quads[..., 3] << 6)
+
+
+def unpack_codes(data, days):
+    """Inverse of pack_codes for one row: bytes -> array of `days` codes."""
+    packed = np.frombuffer(bytes(data), dtype=np.uint8)
+    quads = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=-1)
+    return quads.reshape(-1)[:days]
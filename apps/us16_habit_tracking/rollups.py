@@ -0,0 +1,114 @@
+"""
+Weekly and monthly HabitRollup rows ("Journal: 5 of 7 days this week").
+
+Status changes adjust the two rollups of the changed day in place
+(apply_changes), so summary reads are one row per period instead of a scan
+over that period's logs. rebuild() recomputes them from both log tiers
+(see the rebuild_habit_rollups command).
+"""
+
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from . import archive
+from .models import HabitLog, HabitRollup
+
+COUNTED = {
+    HabitLog.Status.DONE: "done",
+    HabitLog.Status.PARTIAL: "partial",
+    HabitLog.Status.NOT_TODAY: "not_today",
+}
+BATCH_SIZE = 1000
+
+Kind = HabitRollup.PeriodKind
+
+
+def period_start(day, kind):
+    if kind == Kind.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _deltas(changes):
+    """(user_id, habit_id, day, old, new) changes -> {(user_id, habit_id, kind, start): {field: delta}}."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for user_id, habit_id, day, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        for kind in Kind:
+            key = (user_id, habit_id, kind.value, period_start(day, kind))
+            if old_status in COUNTED:
+                deltas[key][COUNTED[old_status]] -= 1
+            if new_status in COUNTED:
+                deltas[key][COUNTED[new_status]] += 1
+    return {key: fields for key, fields in deltas.items() if any(fields.values())}
+
+
+def apply_changes(changes):
+    """
+    Adjust rollups for status changes, each (user_id, habit_id, day, old_status,
+    new_status). Call inside the write's transaction.
+    """
+    deltas = _deltas(changes)
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        HabitRollup.objects.bulk_create(
+            [
+                HabitRollup(user_id=user_id, habit_id=habit_id, period_kind=kind, period_start=start)
+                for user_id, habit_id, kind, start in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        # one UPDATE per distinct delta; a single toggle's week and month share one
+        by_delta = defaultdict(Q)
+        for (_, habit_id, kind, start), fields in deltas.items():
+            by_delta[tuple(sorted(fields.items()))] |= Q(habit_id=habit_id, period_kind=kind, period_start=start)
+        for fields, match in by_delta.items():
+            HabitRollup.objects.filter(match).update(**{name: F(name) + delta for name, delta in fields if delta})
+
+
+def rebuild(habits):
+    """Recompute all rollups of `habits` from their hot and archived logs. Returns rows written."""
+    by_id = {habit.id: habit for habit in habits}
+    counts = defaultdict(lambda: {"done": 0, "partial": 0, "not_today": 0})
+
+    hot = (
+        HabitLog.objects.filter(habit_id__in=by_id, status__in=COUNTED)
+        .order_by("habit_id", "date")
+        .values_list("habit_id", "date", "status")
+        .iterator(chunk_size=2000)
+    )
+    cold = ((habit_id, day, status) for habit_id, day, status, _ in archive.cold_logs(habit_ids=list(by_id)))
+    for habit_id, day, status in heapq.merge(hot, cold):
+        if status in COUNTED:
+            for kind in Kind:
+                counts[(habit_id, kind.value, period_start(day, kind))][COUNTED[status]] += 1
+
+    rows = [
+        HabitRollup(user_id=by_id[habit_id].user_id, habit_id=habit_id, period_kind=kind, period_start=start, **fields)
+        for (habit_id, kind, start), fields in counts.items()
+    ]
+    with transaction.atomic():
+        HabitRollup.objects.filter(habit_id__in=by_id).delete()
+        HabitRollup.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def for_period(user, kind, start):
+    """{habit_id: HabitRollup} for one period of all the user's habits."""
+    rows = HabitRollup.objects.filter(user=user, period_kind=kind, period_start=start)
+    return {row.habit_id: row for row in rows}
+
+
+def history(user, kind, start, end):
+    """The user's rollups with period_start in [start, end], oldest first."""
+    return (
+        HabitRollup.objects.filter(user=user, period_kind=kind, period_start__range=(start, end))
+        .order_by("habit_id", "period_start")
+    )
@@ -0,0 +1,492 @@
+import base64
+import importlib
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import DaySummary
+
+from . import archive, counters, heatmap, rollups
+from .habit_logs import upsert_status
+from .models import Habit, HabitLog, HabitLogArchive, HabitRollup, HabitTemplate
+from .packing import pack_codes, unpack_codes
+from .views import MAX_HEATMAP_DAYS
+
+
+class LibraryAddTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.templates = [
+            HabitTemplate.objects.create(slug=f"t{i}", name=f"Template {i}", intention="Gently", category="Body")
+            for i in range(3)
+        ]
+        self.client.force_login(self.user)
+
+    def _add(self, *templates):
+        return self.client.post("/habits/manage/", {"template_ids": [str(t.id) for t in templates]})
+
+    def test_selection_is_added_once(self):
+        self.assertRedirects(self._add(*self.templates[:2]), "/habits/manage/", fetch_redirect_response=False)
+        # a double submit plus one new pick, and an id that isn't in the library
+        self.client.post("/habits/manage/", {
+            "template_ids": [str(self.templates[0].id), str(self.templates[2].id), "999"],
+        })
+
+        habits = Habit.objects.filter(user=self.user).order_by("template_id")
+        self.assertEqual([h.template_id for h in habits], [t.id for t in self.templates])
+        self.assertEqual(habits[0].intention, "Gently")
+
+    def test_library_hides_added_templates(self):
+        self._add(self.templates[0])
+        response = self.client.get("/habits/manage/")
+        self.assertNotContains(response, f'value="{self.templates[0].id}"')
+        self.assertContains(response, f'value="{self.templates[1].id}"')
+
+    def test_one_habit_per_template_but_any_number_of_custom_habits(self):
+        Habit.objects.create(user=self.user, template=self.templates[0], name="Walk")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Habit.objects.create(user=self.user, template=self.templates[0], name="Walk again")
+
+        Habit.objects.create(user=self.user, name="Custom")
+        Habit.objects.create(user=self.user, name="Custom")
+        other = User.objects.create_user("other", password="pw")
+        Habit.objects.create(user=other, template=self.templates[0], name="Walk")
+        self.assertEqual(Habit.objects.filter(template=self.templates[0]).count(), 2)
+
+
+class PackingTests(SimpleTestCase):
+    def test_layout(self):
+        # day i sits in byte i // 4 at bit 2 * (i % 4)
+        packed = pack_codes([[3, 2, 1, 0, 3]])
+        self.assertEqual(packed.tolist(), [[0b00011011, 0b00000011]])
+
+    def test_round_trip_every_month_length(self):
+        rng = np.random.default_rng(7)
+        for days in range(1, 32):
+            with self.subTest(days=days):
+                codes = rng.integers(0, 4, size=(3, days), dtype=np.uint8)
+                packed = pack_codes(codes)
+                self.assertEqual(packed.shape, (3, -(-days // 4)))
+                for row, data in zip(codes, packed):
+                    self.assertEqual(unpack_codes(data.tobytes(), days).tolist(), row.tolist())
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+        self.other = Habit.objects.create(user=self.user, name="Stretch")
+        self.logs = [
+            (self.habit.id, date(2020, 2, 1), "done", ""),
+            (self.habit.id, date(2020, 2, 2), "none", "slept in"),  # kept for its reflection
+            (self.habit.id, date(2020, 2, 29), "partial", "short one"),
+            (self.habit.id, date(2020, 3, 15), "not_today", ""),
+            (self.other.id, date(2020, 2, 10), "done", ""),
+        ]
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit_id=habit_id, date=day, status=status, reflection=reflection)
+            for habit_id, day, status, reflection in self.logs
+        ])
+        self.recent = HabitLog.objects.create(
+            user=self.user, habit=self.habit, date=timezone.localdate(), status="done",
+        )
+
+    def test_old_months_move_to_the_archive_and_read_back_unchanged(self):
+        self.assertEqual(archive.archive_before(date(2021, 1, 1), chunk_size=1), (3, 5))
+
+        self.assertEqual(list(HabitLog.objects.values_list("id", flat=True)), [self.recent.id])
+        self.assertEqual(HabitLogArchive.objects.count(), 3)
+        row = HabitLogArchive.objects.get(habit=self.habit, month=date(2020, 2, 1))
+        self.assertEqual(len(row.statuses), 8)  # 29 days at 4 per byte
+        self.assertEqual(row.reflections, {"2": "slept in", "29": "short one"})
+
+        self.assertEqual(list(archive.cold_logs(user_id=self.user.id)), self.logs[:4] + self.logs[4:])
+        self.assertEqual(
+            list(archive.cold_logs(habit_ids=[self.habit.id], start=date(2020, 2, 2), end=date(2020, 3, 1))),
+            self.logs[1:3],
+        )
+        self.assertEqual(
+            [day for _, day, _, _ in archive.cold_logs(habit_ids=[self.habit.id], descending=True)],
+            [date(2020, 3, 15), date(2020, 2, 29), date(2020, 2, 2), date(2020, 2, 1)],
+        )
+        self.assertEqual(archive.cold_log(self.habit, date(2020, 2, 29)).status, "partial")
+        self.assertIsNone(archive.cold_log(self.habit, date(2020, 2, 3)))
+
+    def test_recent_ranges_skip_the_archive(self):
+        archive.archive_before(date(2021, 1, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(list(archive.cold_logs(user_id=self.user.id, start=timezone.localdate())), [])
+
+    def test_restore_moves_the_whole_month_back(self):
+        archive.archive_before(date(2021, 1, 1))
+
+        self.assertEqual(archive.restore([(self.habit.id, date(2020, 2, 29)), (self.habit.id, date(2020, 2, 1))]), 1)
+        self.assertEqual(
+            list(HabitLog.objects.filter(habit=self.habit, date__lt=date(2020, 3, 1)).order_by("date")
+                 .values_list("habit_id", "date", "status", "reflection")),
+            self.logs[:3],
+        )
+        self.assertFalse(HabitLogArchive.objects.filter(habit=self.habit, month=date(2020, 2, 1)).exists())
+        self.assertEqual(HabitLogArchive.objects.count(), 2)
+
+    def test_writing_to_an_archived_day_restores_its_month(self):
+        archive.archive_before(date(2021, 1, 1))
+        upsert_status(self.user, self.habit.id, date(2020, 3, 16), "done")
+
+        self.assertEqual(
+            list(HabitLog.objects.filter(habit=self.habit, date__month=3, date__year=2020)
+                 .order_by("date").values_list("status", flat=True)),
+            ["not_today", "done"],
+        )
+        self.assertEqual(list(archive.cold_logs(habit_ids=[self.habit.id])), self.logs[:3])
+
+    def test_archiving_again_merges_into_the_stored_month(self):
+        archive.archive_before(date(2021, 1, 1))
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit=self.habit, date=date(2020, 2, 1), status="not_today"),
+            HabitLog(user=self.user, habit=self.habit, date=date(2020, 2, 2), status="none", reflection=""),
+        ])
+
+        self.assertEqual(archive.archive_before(date(2021, 1, 1)), (1, 2))
+        self.assertEqual(
+            list(archive.cold_logs(habit_ids=[self.habit.id], end=date(2020, 2, 29))),
+            [(self.habit.id, date(2020, 2, 1), "not_today", ""), self.logs[2]],
+        )
+
+    def test_command_refuses_a_horizon_inside_the_counter_windows(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_habit_logs", days=archive.MIN_HOT_DAYS - 1)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+        self.today = timezone.localdate()
+
+    def _set(self, days_ago, status):
+        upsert_status(self.user, self.habit.id, self.today - timedelta(days=days_ago), status)
+
+    def _counters(self):
+        self.habit.refresh_from_db()
+        return {name: getattr(self.habit, name) for name in counters.COUNTER_FIELDS}
+
+    def test_toggles_match_a_rebuild(self):
+        steps = [
+            *[(i, "done") for i in range(8)],  # an 8-day run ending today
+            (20, "partial"), (21, "done"),     # an older, shorter run
+            (3, "not_today"),                  # breaks the longest run
+            (5, "none"),                       # and breaks what is left of it again
+            (3, "partial"),                    # mends the first break
+            (0, "none"),                       # today unlogged: the streak carries from yesterday
+            (40, "done"),                      # outside both windows
+        ]
+        for days_ago, status in steps:
+            with self.subTest(days_ago=days_ago, status=status):
+                self._set(days_ago, status)
+                incremental = self._counters()
+                counters.rebuild([self.habit], self.today)
+                self.assertEqual(incremental, self._counters())
+
+        self.assertEqual((self.habit.current_streak, self.habit.longest_streak), (4, 4))
+        self.assertEqual(self.habit.streak_end, self.today - timedelta(days=1))
+        self.assertEqual(self.habit.last_logged_date, self.today - timedelta(days=1))
+
+    def test_streak_as_of(self):
+        self._set(1, "done")
+        self._set(2, "done")
+        self.habit.refresh_from_db()
+
+        self.assertEqual(self.habit.streak_as_of(self.today), 2)
+        self.assertEqual(self.habit.streak_as_of(self.today + timedelta(days=1)), 0)
+
+    def test_ratios_as_of_moves_stale_counters_onto_today(self):
+        for days_ago, status in [(0, "done"), (6, "partial"), (7, "done"), (29, "done")]:
+            self._set(days_ago, status)
+        yesterday = self.today - timedelta(days=1)
+        counters.rebuild([self.habit], yesterday)
+        stale = Habit.objects.get(id=self.habit.id)
+
+        with self.assertNumQueries(1):
+            counters.ratios_as_of([stale], self.today)
+        counters.rebuild([self.habit], self.today)
+        ratio_fields = ["done_ratio_7", "partial_ratio_7", "done_ratio_30", "partial_ratio_30", "counters_date"]
+        self.assertEqual([getattr(stale, f) for f in ratio_fields], [getattr(self.habit, f) for f in ratio_fields])
+        self.assertEqual(Habit.objects.get(id=self.habit.id).counters_date, self.today)
+
+        with self.assertNumQueries(0):
+            counters.ratios_as_of([stale], self.today)
+
+    def test_migration_backfills_existing_logs(self):
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit=self.habit, date=self.today - timedelta(days=i), status=status)
+            for i, status in [(0, "done"), (1, "partial"), (3, "done"), (4, "done"), (5, "done"), (9, "not_today")]
+        ])
+        migration = importlib.import_module("apps.us16_habit_tracking.migrations.0006_habit_counters")
+        migration.backfill_counters(django_apps, None)
+
+        backfilled = self._counters()
+        counters.rebuild([self.habit], self.today)
+        self.assertEqual(backfilled, self._counters())
+        self.assertEqual((self.habit.current_streak, self.habit.longest_streak), (2, 3))
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+
+    def _rows(self):
+        # a period emptied by toggles keeps its row at zero; rebuild() leaves it out
+        return sorted(
+            HabitRollup.objects.filter(habit=self.habit)
+            .exclude(done=0, partial=0, not_today=0)
+            .values_list("period_kind", "period_start", "done", "partial", "not_today")
+        )
+
+    def test_toggles_match_a_rebuild(self):
+        # Sunday 1 March 2026 closes the week of 23 February but opens March
+        for day, status in [
+            (date(2026, 2, 27), "done"), (date(2026, 3, 1), "done"), (date(2026, 3, 2), "partial"),
+            (date(2026, 3, 1), "not_today"), (date(2026, 2, 27), "none"), (date(2026, 3, 2), "partial"),
+        ]:
+            upsert_status(self.user, self.habit.id, day, status)
+
+        incremental = self._rows()
+        self.assertEqual(incremental, [
+            ("month", date(2026, 3, 1), 0, 1, 1),
+            ("week", date(2026, 2, 23), 0, 0, 1),
+            ("week", date(2026, 3, 2), 0, 1, 0),
+        ])
+        rollups.rebuild([self.habit])
+        self.assertEqual(self._rows(), incremental)
+
+    def test_rebuild_counts_archived_logs(self):
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit=self.habit, date=date(2020, 1, 6) + timedelta(days=i), status="done")
+            for i in range(3)
+        ])
+        archive.archive_before(date(2021, 1, 1))
+
+        rollups.rebuild([self.habit])
+        self.assertEqual(self._rows(), [("month", date(2020, 1, 1), 3, 0, 0), ("week", date(2020, 1, 6), 3, 0, 0)])
+
+    def test_migration_backfills_existing_logs(self):
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit=self.habit, date=date(2026, 1, 5), status="done"),
+            HabitLog(user=self.user, habit=self.habit, date=date(2026, 1, 6), status="not_today"),
+            HabitLog(user=self.user, habit=self.habit, date=date(2020, 1, 31), status="partial"),
+            HabitLog(user=self.user, habit=self.habit, date=date(2020, 2, 1), status="none", reflection="kept"),
+        ])
+        archive.archive_before(date(2021, 1, 1))
+        migration = importlib.import_module("apps.us16_habit_tracking.migrations.0010_habitrollup")
+        migration.backfill_rollups(django_apps, None)
+
+        self.assertEqual(self._rows(), [
+            ("month", date(2020, 1, 1), 0, 1, 0), ("month", date(2026, 1, 1), 1, 0, 1),
+            ("week", date(2020, 1, 27), 0, 1, 0), ("week", date(2026, 1, 5), 1, 0, 1),
+        ])
+        backfilled = self._rows()
+        rollups.rebuild([self.habit])
+        self.assertEqual(self._rows(), backfilled)
+
+    def test_api_reads_the_last_periods(self):
+        today = timezone.localdate()
+        upsert_status(self.user, self.habit.id, today, "done")
+        self.client.force_login(self.user)
+
+        data = self.client.get("/api/habits/rollups/?kind=month&periods=2").json()
+        self.assertEqual(data["end"], today.replace(day=1).isoformat())
+        self.assertEqual(data["habits"][str(self.habit.id)][-1]["done"], 1)
+        self.assertEqual(self.client.get("/api/habits/rollups/?kind=year").status_code, 400)
+        self.assertEqual(self.client.get("/api/habits/rollups/?periods=0").status_code, 400)
+
+
+class HeatmapTests(TestCase):
+    url = "/api/habits/heatmap/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.walk = Habit.objects.create(user=self.user, name="Walk")
+        self.stretch = Habit.objects.create(user=self.user, name="Stretch", is_active=False)
+        self.client.force_login(self.user)
+
+    def _codes(self, habit_data, days):
+        return unpack_codes(base64.b64decode(habit_data["bits"]), days).tolist()
+
+    def test_statuses_land_on_their_day_in_both_tiers(self):
+        HabitLog.objects.bulk_create([
+            HabitLog(user=self.user, habit=self.walk, date=date(2020, 1, 30), status="done"),
+            HabitLog(user=self.user, habit=self.walk, date=date(2020, 2, 1), status="not_today"),
+            HabitLog(user=self.user, habit=self.walk, date=date(2020, 2, 3), status="none", reflection="kept"),
+            HabitLog(user=self.user, habit=self.stretch, date=date(2020, 2, 2), status="partial"),
+            HabitLog(user=self.user, habit=self.stretch, date=date(2020, 2, 9), status="done"),  # after end
+        ])
+        archive.archive_before(date(2020, 2, 1))  # January goes cold, February stays hot
+        other = User.objects.create_user("other", password="pw")
+        HabitLog.objects.create(user=other, habit=Habit.objects.create(user=other, name="Theirs"),
+                                date=date(2020, 2, 1), status="done")
+
+        data = heatmap.build_heatmap(self.user, date(2020, 1, 29), date(2020, 2, 3))
+
+        self.assertEqual((data["start"], data["end"], data["days"]), ("2020-01-29", "2020-02-03", 6))
+        self.assertEqual(data["codes"], {"none": 0, "not_today": 1, "partial": 2, "done": 3})
+        by_name = {h["name"]: h for h in data["habits"]}
+        self.assertEqual(set(by_name), {"Walk", "Stretch"})
+        self.assertFalse(by_name["Stretch"]["is_active"])
+        self.assertEqual(self._codes(by_name["Walk"], 6), [0, 3, 0, 1, 0, 0])
+        self.assertEqual(self._codes(by_name["Stretch"], 6), [0, 0, 0, 0, 2, 0])
+
+    def test_api_defaults_to_a_year_ending_today(self):
+        today = timezone.localdate()
+        upsert_status(self.user, self.walk.id, today, "done")
+
+        data = self.client.get(self.url).json()
+        self.assertEqual((data["end"], data["days"]), (today.isoformat(), 365))
+        walk = next(h for h in data["habits"] if h["id"] == self.walk.id)
+        self.assertEqual(self._codes(walk, 365)[-1], 3)
+
+        data = self.client.get(self.url, {"end": "2020-02-03", "days": 7}).json()
+        self.assertEqual((data["start"], data["end"]), ("2020-01-28", "2020-02-03"))
+
+    def test_api_rejects_bad_parameters(self):
+        for params in [{"days": "x"}, {"days": 0}, {"days": MAX_HEATMAP_DAYS + 1}, {"end": "2026-02-30"}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class BatchToggleTests(TestCase):
+    url = "/api/habits/toggle/batch/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+        self.today = timezone.localdate()
+        self.client.force_login(self.user)
+
+    def _post(self, *ops):
+        response = self.client.post(self.url, json.dumps({"ops": list(ops)}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def _op(self, status, days_ago=0, at=None, habit=None):
+        return {
+            "habit_id": (habit or self.habit).id,
+            "date": (self.today - timedelta(days=days_ago)).isoformat(),
+            "status": status,
+            "updated_at": at.isoformat() if at else None,
+        }
+
+    def _log(self, days_ago=0):
+        return HabitLog.objects.get(habit=self.habit, date=self.today - timedelta(days=days_ago))
+
+    def test_client_time_is_stored_and_older_writes_are_stale(self):
+        tapped = timezone.now() - timedelta(hours=2)
+        self.assertEqual(self._post(self._op("done", at=tapped))[0]["result"], "applied")
+        self.assertEqual(self._log().updated_at, tapped)
+
+        # queued before the stored change: loses
+        results = self._post(self._op("not_today", at=tapped - timedelta(minutes=5)))
+        self.assertEqual(results[0], {"ok": True, "result": "stale", "status": "done"})
+        self.assertEqual(self._log().status, "done")
+
+        # queued after it, though still older than server time now: wins
+        results = self._post(self._op("partial", at=tapped + timedelta(minutes=5)))
+        self.assertEqual(results[0]["result"], "applied")
+        self.assertEqual(self._log().status, "partial")
+
+    def test_client_times_ahead_of_the_server_are_capped(self):
+        self._post(self._op("done", at=timezone.now() + timedelta(days=1)))
+        self.assertLessEqual(self._log().updated_at, timezone.now())
+
+        results = self._post(self._op("partial", at=timezone.now()))
+        self.assertEqual(results[0]["result"], "applied")
+
+    def test_naive_client_times_are_utc(self):
+        self._post({**self._op("done"), "updated_at": "2026-01-01T08:00:00"})
+        self.assertEqual(self._log().updated_at, datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc))
+
+    def test_later_op_for_the_same_day_supersedes(self):
+        results = self._post(self._op("done"), self._op("not_today"))
+        self.assertEqual(results, [
+            {"ok": True, "result": "superseded"},
+            {"ok": True, "result": "applied", "status": "not_today"},
+        ])
+        self.assertEqual(self._log().status, "not_today")
+
+    def test_bad_ops_fail_alone(self):
+        other = Habit.objects.create(user=User.objects.create_user("other", password="pw"), name="Theirs")
+        results = self._post(
+            self._op("done"),
+            self._op("done", habit=other),
+            {**self._op("done"), "status": "maybe"},
+            self._op("done", days_ago=-1),
+            {**self._op("done"), "date": "2026-02-30"},
+            {**self._op("done"), "updated_at": "2026-02-30T08:00:00"},
+        )
+
+        self.assertEqual([r.get("result") or r["error"] for r in results],
+                         ["applied", "unknown habit", "invalid status", "invalid date", "invalid date",
+                          "invalid updated_at"])
+        self.assertFalse(HabitLog.objects.filter(habit=other).exists())
+
+    def test_counters_rollups_and_summaries_match_a_full_rebuild(self):
+        # build a 5-day run, then break it twice in one batch
+        self._post(*[self._op("done", days_ago=i) for i in range(5)])
+        self.habit.refresh_from_db()
+        self.assertEqual((self.habit.current_streak, self.habit.longest_streak), (5, 5))
+
+        self._post(self._op("not_today", days_ago=1), self._op("none", days_ago=3), self._op("partial", days_ago=6))
+
+        self.habit.refresh_from_db()
+        incremental = [getattr(self.habit, name) for name in counters.COUNTER_FIELDS]
+        counters.rebuild([self.habit], self.today)
+        self.habit.refresh_from_db()
+        self.assertEqual(incremental, [getattr(self.habit, name) for name in counters.COUNTER_FIELDS])
+        self.assertEqual((self.habit.current_streak, self.habit.longest_streak), (1, 1))
+
+        done = sum(HabitRollup.objects.filter(habit=self.habit, period_kind=HabitRollup.PeriodKind.WEEK)
+                   .values_list("done", flat=True))
+        self.assertEqual(done, 3)
+        summary = DaySummary.objects.get(user=self.user, date=self.today - timedelta(days=1))
+        self.assertEqual((summary.habits_done, summary.habits_not_today), (0, 1))
+
+    def test_one_upsert_per_batch_and_counters_for_every_habit(self):
+        others = [Habit.objects.create(user=self.user, name=f"Habit {i}") for i in range(3)]
+        self._post(self._op("done", days_ago=2))
+        ops = [self._op("done", habit=habit) for habit in others]
+        ops += [self._op("done", days_ago=1), self._op("done")]
+
+        with CaptureQueriesContext(connection) as ctx:
+            self._post(*ops)
+
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "us16_habit_tracking_habitlog"')]
+        self.assertEqual(len(inserts), 1)
+        for habit in [self.habit, *others]:
+            habit.refresh_from_db()
+            incremental = [getattr(habit, name) for name in counters.COUNTER_FIELDS]
+            counters.rebuild([habit], self.today)
+            habit.refresh_from_db()
+            self.assertEqual(incremental, [getattr(habit, name) for name in counters.COUNTER_FIELDS])
+        self.assertEqual((self.habit.current_streak, others[0].current_streak), (3, 1))
+
+    def test_payload_limits(self):
+        response = self.client.post(self.url, json.dumps({"ops": []}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_toggle_and_reflection_reject_an_impossible_date(self):
+        response = self.client.post(f"/api/habits/{self.habit.id}/toggle/", {"status": "done", "date": "2026-02-30"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f"/habits/{self.habit.id}/reflection/", {"date": "2026-02-30"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(HabitLog.objects.exists())
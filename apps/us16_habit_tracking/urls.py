@@ -5,8 +5,11 @@ urlpatterns = [
     path("habits/", views.habits_today, name="habits_today"),
     path("habits/manage/", views.habits_manage, name="habits_manage"),
     path("habits/<int:habit_id>/edit/", views.habit_edit, name="habit_edit"),
-    path("habits/log/<int:log_id>/reflection/", views.habit_reflection, name="habit_reflection"),
-    path("api/habits/log/<int:log_id>/toggle/", views.api_toggle_habit, name="api_toggle_habit"),
+    path("habits/<int:habit_id>/reflection/", views.habit_reflection, name="habit_reflection"),
+    path("api/habits/<int:habit_id>/toggle/", views.api_toggle_habit, name="api_toggle_habit"),
+    path("api/habits/toggle/batch/", views.api_toggle_habits_batch, name="api_toggle_habits_batch"),
+    path("api/habits/heatmap/", views.api_habit_heatmap, name="api_habit_heatmap"),
+    path("api/habits/rollups/", views.api_habit_rollups, name="api_habit_rollups"),
 
     path("habits/<int:habit_id>/pause/", views.habit_pause, name="habit_pause"),
     path("habits/<int:habit_id>/remove/", views.habit_remove, name="habit_remove"),
@@ -1,35 +1,61 @@
-from collections import defaultdict
+import json
+from datetime import timedelta, timezone as dt_timezone
 
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import Http404, JsonResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.views.decorators.http import require_POST
 
+from core import summaries
+
+from . import archive, counters, rollups
+from .catalog import get_catalog
 from .forms import HabitForm, HabitLogReflectionForm
-from .models import Habit, HabitLog, HabitTemplate
+from .habit_logs import apply_batch, upsert_status
+from .heatmap import build_heatmap
+from .models import Habit, HabitLog, HabitRollup
+
+
+MAX_HEATMAP_DAYS = 366 * 2
+MAX_BATCH_OPS = 200
+MAX_ROLLUP_PERIODS = 104
 
 
 @login_required
 def habits_today(request):
     """
     Shows today's active habits and lets user mark status (Done / A little / Not today).
-    Ensures a HabitLog exists for each active habit for today.
+    Read-only: habits without a HabitLog today show "No entry" until the user
+    picks a status (see api_toggle_habit).
     """
     today = timezone.localdate()
     habits = Habit.objects.filter(user=request.user, is_active=True)
 
-    existing_logs = HabitLog.objects.filter(user=request.user, date=today, habit__in=habits)
+    # no default ordering: it joins Habit for the name and sorts rows only used as a dict
+    existing_logs = HabitLog.objects.for_user_day(request.user, today).filter(habit__in=habits).order_by()
     logs_by_habit_id = {log.habit_id: log for log in existing_logs}
+    this_week = rollups.for_period(request.user, HabitRollup.PeriodKind.WEEK, rollups.period_start(today, HabitRollup.PeriodKind.WEEK))
 
     items = []
     for habit in habits:
         log = logs_by_habit_id.get(habit.id)
-        if not log:
-            log = HabitLog.objects.create(user=request.user, habit=habit, date=today)
-        items.append({"habit": habit, "log": log})
-
-    return render(request, "pages/habits/today.html", {"today": today, "items": items})
+        status = log.status if log else HabitLog.Status.NONE
+        week = this_week.get(habit.id)
+        items.append({
+            "habit": habit,
+            "log": log,
+            "status": status,
+            "status_label": HabitLog.Status(status).label,
+            "week_showed_up": week.showed_up if week else 0,
+        })
+
+    return render(request, "pages/habits/today.html", {
+        "today": today,
+        "items": items,
+        "week_days_so_far": today.weekday() + 1,
+    })
 
 
 @login_required
@@ -40,34 +66,38 @@ def habits_manage(request):
     - Create a custom habit.
     - View and manage existing habits (pause/remove/edit handled by other endpoints).
     """
-    habits = Habit.objects.filter(user=request.user)
-    total_templates = HabitTemplate.objects.filter(is_active=True).count()
-
-    existing_template_ids = habits.exclude(template__isnull=True).values_list("template_id", flat=True)
-    templates = HabitTemplate.objects.filter(is_active=True).exclude(id__in=existing_template_ids)
+    habits = counters.ratios_as_of(list(Habit.objects.filter(user=request.user)), timezone.localdate())
+    library = get_catalog()
 
-    templates_by_category = defaultdict(list)
-    for t in templates:
-        templates_by_category[t.category or "Other"].append(t)
-
-    added_from_library_count = habits.exclude(template__isnull=True).count()
+    existing_template_ids = {h.template_id for h in habits if h.template_id}
+    templates_by_category = library.grouped_excluding(existing_template_ids)
+    added_from_library_count = sum(1 for h in habits if h.template_id)
 
     if request.method == "POST":
         # 1) Multi-select add from library
         selected_ids = request.POST.getlist("template_ids")
         if selected_ids:
-            selected_templates = HabitTemplate.objects.filter(is_active=True, id__in=selected_ids)
-
-            for template in selected_templates:
-                Habit.objects.get_or_create(
-                    user=request.user,
-                    template=template,
-                    defaults={
-                        "name": template.name,
-                        "intention": template.intention,
-                        "is_active": True,
-                    },
-                )
+            selected_templates = [
+                library.by_id[int(i)] for i in selected_ids if i.isdigit() and int(i) in library.by_id
+            ]
+
+            # one INSERT for the whole selection; (user, template) is unique, so
+            # already-added templates and double submits are skipped by the DB
+            Habit.objects.bulk_create(
+                [
+                    Habit(
+                        user=request.user,
+                        template_id=template.id,
+                        name=template.name,
+                        intention=template.intention,
+                        is_active=True,
+                    )
+                    for template in selected_templates
+                ],
+                ignore_conflicts=True,
+            )
+            # new habits count towards today's total from today on
+            summaries.refresh_days(request.user.id, [timezone.localdate()])
 
             return redirect("habits_manage")
 
@@ -77,15 +107,16 @@ def habits_manage(request):
             habit = form.save(commit=False)
             habit.user = request.user
             habit.save()
+            summaries.refresh_days(request.user.id, [timezone.localdate()])
             return redirect("habits_manage")
     else:
         form = HabitForm()
 
     return render(request, "pages/habits/manage.html", {
         "habits": habits,
-        "templates_by_category": dict(templates_by_category),
+        "templates_by_category": templates_by_category,
         "form": form,
-        "total_templates": total_templates,
+        "total_templates": len(library),
         "added_from_library_count": added_from_library_count,
     })
 
@@ -98,6 +129,8 @@ def habit_edit(request, habit_id):
         form = HabitForm(request.POST, instance=habit)
         if form.is_valid():
             form.save()
+            if "is_active" in form.changed_data:
+                _refresh_habit_days(habit)
             return redirect("habits_manage")
     else:
         form = HabitForm(instance=habit)
@@ -114,6 +147,7 @@ def habit_pause(request, habit_id):
     habit = get_object_or_404(Habit, id=habit_id, user=request.user)
     habit.is_active = False
     habit.save(update_fields=["is_active"])
+    _refresh_habit_days(habit)
     return redirect("habits_manage")
 
 
@@ -125,16 +159,53 @@ def habit_remove(request, habit_id):
     (Safe because habits can be re-added from the library.)
     """
     habit = get_object_or_404(Habit, id=habit_id, user=request.user)
+    logged_days = {
+        *HabitLog.objects.filter(habit=habit).values_list("date", flat=True),
+        *(day for _, day, _, _ in archive.cold_logs(habit_ids=[habit.id])),
+    }
+    # the cascaded HabitLog deletes skip their per-row summary refresh (core/signals.py)
     habit.delete()
+    _refresh_habit_days(habit, logged_days)
     return redirect("habits_manage")
 
 
+def _refresh_habit_days(habit, days=()):
+    """Day summaries a habit's total counts towards, after it was paused, resumed or removed."""
+    summaries.refresh_since(habit.user_id, timezone.localdate(habit.created_at), days)
+
+
+def _log_day(request):
+    """Day a log write refers to: ?date= / POST date=YYYY-MM-DD, default today, never the future."""
+    today = timezone.localdate()
+    raw = request.POST.get("date") or request.GET.get("date")
+    if not raw:
+        return today
+    try:
+        day = parse_date(raw)
+    except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+        day = None
+    if day is None or day > today:
+        raise ValueError("Invalid date")
+    return day
+
+
 @login_required
-def habit_reflection(request, log_id):
+def habit_reflection(request, habit_id):
     """
-    Add/edit a reflection note for a given HabitLog.
+    Add/edit a reflection note for a habit on a day (default today).
+    The HabitLog row is only created when a reflection is saved.
     """
-    log = get_object_or_404(HabitLog, id=log_id, user=request.user)
+    habit = get_object_or_404(Habit, id=habit_id, user=request.user)
+    try:
+        day = _log_day(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date")
+
+    if request.method == "POST":
+        archive.restore([(habit.id, day)])
+    log = HabitLog.objects.filter(habit=habit, date=day).first()
+    if log is None:
+        log = archive.cold_log(habit, day) or HabitLog(user=request.user, habit=habit, date=day)
 
     if request.method == "POST":
         form = HabitLogReflectionForm(request.POST, instance=log)
@@ -149,18 +220,153 @@ def habit_reflection(request, log_id):
 
 @login_required
 @require_POST
-def api_toggle_habit(request, log_id):
+def api_toggle_habit(request, habit_id):
     """
-    POST: status=done|partial|not_today|none
-    Used by Today page buttons.
+    POST: status=done|partial|not_today|none, optional date=YYYY-MM-DD (default today)
+    Used by Today page buttons. Upserts the day's HabitLog in one statement.
     """
-    log = get_object_or_404(HabitLog, id=log_id, user=request.user)
     status = request.POST.get("status")
 
     valid = {choice[0] for choice in HabitLog.Status.choices}
     if status not in valid:
         return HttpResponseBadRequest("Invalid status")
 
-    log.status = status
-    log.save(update_fields=["status", "updated_at"])
-    return JsonResponse({"ok": True, "status": log.status})
\ No newline at end of file
+    try:
+        day = _log_day(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date")
+
+    try:
+        habit = upsert_status(request.user, habit_id, day, status)
+    except Habit.DoesNotExist:
+        raise Http404("No such habit")
+
+    return JsonResponse({
+        "ok": True,
+        "status": status,
+        "date": day.isoformat(),
+        "current_streak": habit.streak_as_of(timezone.localdate()),
+        "longest_streak": habit.longest_streak,
+    })
+
+
+def _parse_batch_op(raw, today):
+    """Validate one batch item; returns (op, None) or (None, error message)."""
+    if not isinstance(raw, dict):
+        return None, "expected an object"
+
+    valid = {choice[0] for choice in HabitLog.Status.choices}
+    if raw.get("status") not in valid:
+        return None, "invalid status"
+
+    try:
+        day = parse_date(str(raw.get("date") or "")) if raw.get("date") else today
+    except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+        day = None
+    if day is None or day > today:
+        return None, "invalid date"
+
+    updated_at = None
+    if raw.get("updated_at"):
+        try:
+            updated_at = parse_datetime(str(raw["updated_at"]))
+        except ValueError:
+            updated_at = None
+        if updated_at is None:
+            return None, "invalid updated_at"
+        if timezone.is_naive(updated_at):
+            updated_at = timezone.make_aware(updated_at, dt_timezone.utc)
+
+    try:
+        habit_id = int(raw.get("habit_id"))
+    except (TypeError, ValueError):
+        return None, "invalid habit_id"
+
+    return {"habit_id": habit_id, "date": day, "status": raw["status"], "updated_at": updated_at}, None
+
+
+@login_required
+@require_POST
+def api_toggle_habits_batch(request):
+    """
+    POST JSON: {"ops": [{"habit_id": 1, "date": "YYYY-MM-DD", "status": "done",
+                         "updated_at": "<ISO time of the tap>"}, ...]}
+    Applies every op in one transaction, under one lock on the habits, and returns
+    {"results": [...]} in the same order, so an offline queue can drop what
+    went through. date defaults to today; updated_at drives last-write-wins.
+    """
+    try:
+        raw_ops = json.loads(request.body or b"{}").get("ops")
+    except (ValueError, AttributeError):
+        return HttpResponseBadRequest("Invalid JSON")
+    if not isinstance(raw_ops, list) or not 0 < len(raw_ops) <= MAX_BATCH_OPS:
+        return HttpResponseBadRequest(f"ops must be a list of 1-{MAX_BATCH_OPS} items")
+
+    today = timezone.localdate()
+    results = [None] * len(raw_ops)
+    ops, positions = [], []
+    for index, raw in enumerate(raw_ops):
+        op, error = _parse_batch_op(raw, today)
+        if error:
+            results[index] = {"ok": False, "error": error}
+        else:
+            ops.append(op)
+            positions.append(index)
+
+    for index, result in zip(positions, apply_batch(request.user, ops, today)):
+        results[index] = result
+
+    return JsonResponse({"results": results})
+
+
+@login_required
+def api_habit_rollups(request):
+    """
+    GET ?kind=week|month&periods=N (default 12): per-habit done/partial/not_today
+    counts for the last N weeks or months, read from HabitRollup.
+    """
+    kind = request.GET.get("kind", HabitRollup.PeriodKind.WEEK)
+    if kind not in HabitRollup.PeriodKind.values:
+        return HttpResponseBadRequest("Invalid kind")
+    try:
+        periods = int(request.GET.get("periods", 12))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid periods")
+    if not 1 <= periods <= MAX_ROLLUP_PERIODS:
+        return HttpResponseBadRequest(f"periods must be 1-{MAX_ROLLUP_PERIODS}")
+
+    end = rollups.period_start(timezone.localdate(), kind)
+    start = end
+    for _ in range(periods - 1):
+        start = rollups.period_start(start - timedelta(days=1), kind)
+
+    result = {}
+    for row in rollups.history(request.user, kind, start, end):
+        result.setdefault(str(row.habit_id), []).append({
+            "period_start": row.period_start.isoformat(),
+            "done": row.done,
+            "partial": row.partial,
+            "not_today": row.not_today,
+        })
+    return JsonResponse({"kind": kind, "start": start.isoformat(), "end": end.isoformat(), "habits": result})
+
+
+@login_required
+def api_habit_heatmap(request):
+    """
+    GET ?days=365&end=YYYY-MM-DD -> bit-packed statuses for every habit (see heatmap.py).
+    """
+    today = timezone.localdate()
+    try:
+        end = parse_date(request.GET.get("end") or "") or today
+    except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+        return HttpResponseBadRequest("Invalid end")
+    try:
+        days = int(request.GET.get("days", 365))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid days")
+    if not 1 <= days <= MAX_HEATMAP_DAYS:
+        return HttpResponseBadRequest(f"days must be between 1 and {MAX_HEATMAP_DAYS}")
+
+    start = end - timedelta(days=days - 1)
+    return JsonResponse(build_heatmap(request.user, start, end))
@@ -12,5 +12,14 @@ class UserProfile(models.Model):
     avg_cycle_length = models.PositiveIntegerField(null=True, blank=True)
     last_period_start = models.DateField(null=True, blank=True)
 
+    # Cycle predictions, maintained by core.predictions
+    predicted_cycle_length = models.FloatField(null=True, blank=True)
+    cycle_length_std = models.FloatField(null=True, blank=True)
+    predicted_period_length = models.PositiveSmallIntegerField(null=True, blank=True)
+    next_period_start = models.DateField(null=True, blank=True)
+    next_period_window_start = models.DateField(null=True, blank=True)
+    next_period_window_end = models.DateField(null=True, blank=True)
+    predictions_updated_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return f"{self.user.username}'s profile"
@@ -2,6 +2,7 @@ from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
 
 from apps.us1_create_login.models import UserProfile
+from core import predictions
 from .forms import StartTrackingForm
 
 
@@ -23,6 +24,8 @@ def onboarding_view(request):
             profile.last_period_start = form.cleaned_data["last_period_start"]
             profile.has_completed_onboarding = True
             profile.save()
+            # onboarding data is the fallback until there is cycle history
+            predictions.refresh_users([request.user.id])
             return redirect("calendar")
     else:
         # prefill the form for editing / returning users
@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path("log-period/", views.log_period, name="log_period"),
+    path("log-period/import/", views.import_periods, name="import_periods"),
 ]
 
@@ -1,23 +1,60 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from core.models import Cycle
+from django.utils.dateparse import parse_date
+
+from core.cycle_import import detect_format, import_cycles
+from core.cycles import save_cycle
+
+
+def _parse_day(raw):
+    """A date from the form, or None; well-formed but impossible dates (2026-02-30) count as invalid."""
+    try:
+        return parse_date(raw or "")
+    except ValueError:
+        return None
+
 
 @login_required
 def log_period(request):
+    error = None
+
     if request.method == "POST":
-        start_date = request.POST.get("start_date")
+        start_date = _parse_day(request.POST.get("start_date"))
+        end_date = _parse_day(request.POST.get("end_date"))
 
         if start_date:
-            Cycle.objects.create(
-                user=request.user,
-                start_date=start_date
-            )
+            try:
+                save_cycle(request.user, start_date, end_date)
+                return redirect("calendar")
+            except ValueError as exc:
+                error = str(exc)
+        else:
+            error = "Please enter a valid start date."
 
-            profile = request.user.userprofile
-            profile.last_period_start = cycle.start_date
-            profile.save()
+    return render(request, "pages/cycle/log_cycle.html", {"error": error})
 
-            return redirect("calendar")
 
-    return render(request, "pages/cycle/log_cycle.html")
+@login_required
+def import_periods(request):
+    """
+    Upload past periods from another tracker (CSV or JSON).
+    Django spools large uploads to disk and the file is parsed as a stream.
+    """
+    result = None
+    error = None
+
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        fmt = detect_format(upload.name) if upload else None
+
+        if not upload:
+            error = "Please choose a file to import."
+        elif fmt is None:
+            error = "Please upload a .csv, .json or .jsonl file."
+        else:
+            try:
+                result = import_cycles(request.user, upload, fmt)
+            except (ValueError, UnicodeDecodeError) as exc:
+                error = f"We couldn't read that file: {exc}"
 
+    return render(request, "pages/cycle/import_cycles.html", {"result": result, "error": error})
@@ -0,0 +1,93 @@
+"""
+core/calendar_cache.py
+
+Per-process LRU cache of rendered calendar month grids.
+
+Grids are keyed on (user, year, month, today, epoch). The epoch is a per-user
+CalendarEpoch row bumped whenever one of the user's Cycle or DayNote rows is
+saved or deleted (see core/signals.py), so a changed month is simply never
+looked up again and ages out of the LRU. Keeping it in the database means a
+bump reaches every worker process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models import F
+
+from core.models import CalendarEpoch
+
+MAX_GRIDS = 512
+
+
+def get_epoch(user_id):
+    return CalendarEpoch.objects.filter(user_id=user_id).values_list("epoch", flat=True).first() or 0
+
+
+def bump_epoch(user_id):
+    bump_epochs([user_id])
+
+
+def bump_epochs(user_ids):
+    """Bump several users' epochs in one UPDATE (plus one INSERT for first bumps)."""
+    user_ids = set(user_ids)
+    if CalendarEpoch.objects.filter(user_id__in=user_ids).update(epoch=F("epoch") + 1) == len(user_ids):
+        return
+    # first bump for some users (a concurrent one may insert the row too); seeding
+    # from the clock keeps a reused user id from matching an old grid
+    missing = user_ids - set(
+        CalendarEpoch.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True)
+    )
+    seed = time.time_ns()
+    CalendarEpoch.objects.bulk_create(
+        [CalendarEpoch(user_id=user_id, epoch=seed) for user_id in missing], ignore_conflicts=True,
+    )
+    CalendarEpoch.objects.filter(user_id__in=missing).update(epoch=F("epoch") + 1)
+
+class MonthGridCache:
+    """Thread-safe LRU of rendered grids with hit/miss counters."""
+
+    def __init__(self, max_size=MAX_GRIDS):
+        self.max_size = max_size
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._grids.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._grids.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        with self._lock:
+            self._grids[key] = html
+            self._grids.move_to_end(key)
+            while len(self._grids) > self.max_size:
+                self._grids.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._grids.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "size": len(self._grids),
+                "max_size": self.max_size,
+            }
+
+
+month_grids = MonthGridCache()
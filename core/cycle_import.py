@@ -0,0 +1,151 @@
+"""
+core/cycle_import.py
+
+Bulk import of past periods from other trackers. Files are read as a stream
+(CSV with start_date/end_date columns, a JSON array of objects, or JSON Lines)
+and inserted with batched bulk_create, so memory stays flat however long the
+history is. Follow-up work that Cycle saves normally trigger (profile, day
+summaries, predictions, calendar cache) runs once at the end.
+"""
+
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from core import predictions, summaries
+from core.cycles import bump_last_period_start
+from core.models import Cycle
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 20
+READ_SIZE = 64 * 1024
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []  # first MAX_REPORTED_ERRORS messages only
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Row {row_number}: {message}")
+
+
+def _iter_csv(text):
+    for row in csv.DictReader(text):
+        yield row
+
+
+def _iter_json(text):
+    """
+    Objects from a top-level JSON array or from JSON Lines, decoded one at a
+    time from a rolling buffer instead of json.load() on the whole file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,[]")
+        if not buffer:
+            if eof:
+                return
+            chunk = text.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("File is not valid JSON.")
+            # object continues in the next chunk
+            chunk = text.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield obj
+        buffer = buffer[end:]
+
+
+def iter_rows(binary_file, fmt):
+    """(start_date, end_date) string pairs from a binary file-like object."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    reader = _iter_csv(text) if fmt == "csv" else _iter_json(text)
+    for row in reader:
+        if not isinstance(row, dict):
+            yield None, None
+            continue
+        yield row.get("start_date"), row.get("end_date")
+
+
+def detect_format(filename):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".json", ".jsonl", ".ndjson")):
+        return "json"
+    return None
+
+
+def _parse_day(raw):
+    """None for a malformed date and for a well-formed impossible one (2026-02-30)."""
+    try:
+        return parse_date(str(raw or "").strip())
+    except ValueError:
+        return None
+
+
+def import_cycles(user, binary_file, fmt):
+    """Import one file for `user`. Returns an ImportResult."""
+    result = ImportResult()
+    # only start dates are kept around, which is tiny even for decades of history
+    seen = set(Cycle.objects.filter(user=user).values_list("start_date", flat=True))
+    latest_start = None
+    batch = []
+
+    with transaction.atomic():
+        for row_number, (raw_start, raw_end) in enumerate(iter_rows(binary_file, fmt), start=1):
+            start = _parse_day(raw_start)
+            end = _parse_day(raw_end) if raw_end else None
+
+            if not start:
+                result.add_error(row_number, "missing or invalid start_date (use YYYY-MM-DD)")
+                continue
+            if raw_end and not end:
+                result.add_error(row_number, "invalid end_date (use YYYY-MM-DD)")
+                continue
+            if end and end < start:
+                result.add_error(row_number, "end_date is before start_date")
+                continue
+            if start in seen:
+                result.duplicates += 1
+                continue
+
+            seen.add(start)
+            latest_start = max(latest_start or start, start)
+            batch.append(Cycle(user=user, start_date=start, end_date=end))
+            if len(batch) >= BATCH_SIZE:
+                Cycle.objects.bulk_create(batch)
+                result.created += len(batch)
+                batch = []
+
+        if batch:
+            Cycle.objects.bulk_create(batch)
+            result.created += len(batch)
+
+        if result.created:
+            # once per import, not once per row; refresh_users() also bumps the calendar epoch
+            bump_last_period_start(user.id, latest_start)
+            summaries.rebuild_user(user.id)
+            predictions.refresh_users([user.id])
+
+    return result
@@ -0,0 +1,48 @@
+"""
+core/cycles.py
+
+The one write path for Cycle rows. Views and commands call save_cycle()
+instead of Cycle.objects.create() so the profile's last_period_start and
+stored predictions are kept in step inside the same transaction.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.us1_create_login.models import UserProfile
+from core import predictions
+from core.models import Cycle
+
+
+def bump_last_period_start(user_id, start_date):
+    """
+    Move UserProfile.last_period_start forward to start_date if it is newer,
+    as a single conditional UPDATE (no profile read, no full-row save).
+    """
+    return (
+        UserProfile.objects
+        .filter(user_id=user_id)
+        .filter(Q(last_period_start__isnull=True) | Q(last_period_start__lt=start_date))
+        .update(last_period_start=start_date)
+    )
+
+
+def save_cycle(user, start_date, end_date=None, cycle=None):
+    """
+    Create a cycle, or edit `cycle` when given. Dates must already be parsed.
+    Raises ValueError if end_date is before start_date.
+    """
+    if end_date and end_date < start_date:
+        raise ValueError("End date can't be before the start date.")
+
+    with transaction.atomic():
+        if cycle is None:
+            cycle = Cycle(user=user)
+        cycle.start_date = start_date
+        cycle.end_date = end_date
+        cycle.save()
+        bump_last_period_start(cycle.user_id, start_date)
+        # also bumps the calendar epoch, once
+        predictions.refresh_users([cycle.user_id])
+
+    return cycle
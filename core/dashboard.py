@@ -0,0 +1,65 @@
+"""
+core/dashboard.py
+
+Everything the dashboard needs in at most two queries:
+  1. the user row with profile (select_related), latest cycle, active habit
+     count and today's DaySummary habit counts as subquery annotations;
+  2. today's DailyCheckIn.
+core/tests.py holds this to its query budget.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.us13_checkin_prompt.models import DailyCheckIn
+from apps.us16_habit_tracking.models import Habit
+from core.models import Cycle, DaySummary
+
+
+def _count(queryset):
+    """Correlated COUNT(*) subquery that yields 0 instead of NULL."""
+    counted = queryset.order_by().values("user").annotate(n=Count("id")).values("n")
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def load_dashboard(user, today):
+    latest_cycle = Cycle.objects.filter(user=OuterRef("pk")).order_by("-start_date")
+    todays_summary = DaySummary.objects.for_user_day(OuterRef("pk"), today)
+
+    def summary_count(field):
+        return Coalesce(Subquery(todays_summary.values(field)[:1]), Value(0))
+
+    row = (
+        User.objects.filter(pk=user.pk)
+        .select_related("profile")
+        .annotate(
+            latest_cycle_start=Subquery(latest_cycle.values("start_date")[:1]),
+            latest_cycle_end=Subquery(latest_cycle.values("end_date")[:1]),
+            habits_active=_count(Habit.objects.filter(user=OuterRef("pk"), is_active=True)),
+            habits_done=summary_count("habits_done"),
+            habits_partial=summary_count("habits_partial"),
+            habits_skipped=summary_count("habits_not_today"),
+        )
+        .get()
+    )
+
+    try:
+        profile = row.profile
+    except User.profile.RelatedObjectDoesNotExist:
+        profile = None
+
+    return {
+        "profile": profile,
+        "latest_cycle": (
+            {"start_date": row.latest_cycle_start, "end_date": row.latest_cycle_end}
+            if row.latest_cycle_start else None
+        ),
+        "checkin": DailyCheckIn.objects.for_user_day(user, today).first(),
+        "habits": {
+            "active": row.habits_active,
+            "done": row.habits_done,
+            "partial": row.habits_partial,
+            "not_today": row.habits_skipped,
+        },
+    }
@@ -0,0 +1,102 @@
+"""
+core/export.py
+
+"Download my data": generators that stream a user's rows as NDJSON, or as a
+zip of CSVs built on the fly. Rows come from .iterator(chunk_size=...) and
+output is yielded in small pieces, so memory stays flat and the first bytes
+go out before the last rows are read.
+"""
+
+import csv
+import io
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt.models import DailyCheckIn
+from apps.us16_habit_tracking import archive
+from apps.us16_habit_tracking.models import Habit, HabitLog
+from core.models import Cycle
+
+CHUNK_SIZE = 2000
+ROWS_PER_YIELD = 500
+
+
+def _archived_habit_logs(user):
+    return archive.cold_logs(user_id=user.id)
+
+
+# (name, model or row function, exported fields)
+SOURCES = [
+    ("cycles", Cycle, ["id", "start_date", "end_date", "created_at"]),
+    ("day_notes", DayNote, ["id", "date", "title", "body", "created_at", "updated_at"]),
+    ("habits", Habit, ["id", "name", "intention", "is_active", "template_id", "created_at"]),
+    ("habit_logs", HabitLog, ["id", "habit_id", "date", "status", "reflection", "created_at", "updated_at"]),
+    ("archived_habit_logs", _archived_habit_logs, ["habit_id", "date", "status", "reflection"]),
+    ("checkins", DailyCheckIn, ["id", "date", "status", "prompt_text", "response_text", "created_at", "updated_at"]),
+]
+
+
+def _rows(user, model, fields):
+    if not isinstance(model, type):
+        return model(user)
+    return (
+        model.objects.filter(user=user)
+        .order_by("pk")  # skip default orderings that join (HabitLog orders by habit__name)
+        .values_list(*fields)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def stream_ndjson(user):
+    """One JSON object per line, tagged with its source under "type"."""
+    encoder = DjangoJSONEncoder()
+    for name, model, fields in SOURCES:
+        lines = []
+        for row in _rows(user, model, fields):
+            record = {"type": name, **dict(zip(fields, row))}
+            lines.append(encoder.encode(record))
+            if len(lines) >= ROWS_PER_YIELD:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+
+class _Pipe:
+    """Write-only, unseekable sink; zipfile writes into it and we drain it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(user):
+    """A zip with one CSV per source, compressed and emitted as it is written."""
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, model, fields in SOURCES:
+            with zf.open(f"{name}.csv", mode="w", force_zip64=True) as entry:
+                text = io.TextIOWrapper(entry, encoding="utf-8", newline="", write_through=True)
+                writer = csv.writer(text)
+                writer.writerow(fields)
+                for count, row in enumerate(_rows(user, model, fields), start=1):
+                    writer.writerow(row)
+                    if count % ROWS_PER_YIELD == 0:
+                        yield pipe.drain()
+                text.detach()
+            yield pipe.drain()
+    yield pipe.drain()
+
@@ -0,0 +1,138 @@
+"""
+core/journal.py
+
+The journal: notes, habit reflections (hot and archived) and answered
+check-ins in one newest-first feed.
+
+Every entry has a sort key (date, source rank, id). Each source is read as
+its own stream in that order, starting just below the cursor and capped at
+one page, and the streams are k-way merged with heapq. Loading an old page
+costs the same as loading the first.
+"""
+
+import heapq
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+from itertools import islice
+
+from django.db.models import Q
+from django.urls import reverse
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt.models import DailyCheckIn
+from apps.us16_habit_tracking.models import HabitLog, HabitLogArchive
+
+PAGE_SIZE = 20
+
+# tie-break between sources on the same day (higher comes first)
+NOTE, CHECKIN, HABIT, ARCHIVED_HABIT = 3, 2, 1, 0
+
+
+def encode_cursor(key):
+    day, rank, item_id = key
+    return urlsafe_b64encode(f"{day.isoformat()}|{rank}|{item_id}".encode()).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """(date, rank, id) from a cursor; ValueError if it was tampered with."""
+    try:
+        day, rank, item_id = urlsafe_b64decode(cursor.encode("ascii")).decode().split("|")
+        return date.fromisoformat(day), int(rank), int(item_id)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _below(cursor, rank):
+    """Q for rows of a source with `rank` whose (date, id) sort after `cursor`."""
+    if cursor is None:
+        return Q()
+    day, cursor_rank, item_id = cursor
+    if rank < cursor_rank:
+        return Q(date__lte=day)
+    if rank > cursor_rank:
+        return Q(date__lt=day)
+    return Q(date__lt=day) | Q(date=day, id__lt=item_id)
+
+
+def _notes(user, cursor, limit):
+    rows = (
+        DayNote.objects.filter(_below(cursor, NOTE), user=user)
+        .order_by("-date", "-id").values_list("id", "date", "title", "body")[:limit]
+    )
+    for note_id, day, title, body in rows:
+        yield (day, NOTE, note_id), {
+            "kind": "note", "date": day, "title": title, "text": body,
+            "url": reverse("notes_for_day", args=[day.isoformat()]),
+        }
+
+
+def _checkins(user, cursor, limit):
+    rows = (
+        DailyCheckIn.objects.filter(
+            _below(cursor, CHECKIN), user=user, status=DailyCheckIn.STATUS_COMPLETED,
+        )
+        .exclude(response_text="")
+        .order_by("-date", "-id").values_list("id", "date", "prompt_text", "response_text")[:limit]
+    )
+    for checkin_id, day, prompt, response in rows:
+        yield (day, CHECKIN, checkin_id), {
+            "kind": "checkin", "date": day, "title": prompt, "text": response, "url": None,
+        }
+
+
+def _reflection(habit_id, name, day, text):
+    return {
+        "kind": "habit", "date": day, "title": name, "text": text,
+        "url": f"{reverse('habit_reflection', args=[habit_id])}?date={day.isoformat()}",
+    }
+
+
+def _reflections(user, cursor, limit):
+    rows = (
+        HabitLog.objects.filter(_below(cursor, HABIT), user=user)
+        .exclude(reflection="")
+        .order_by("-date", "-id").values_list("id", "habit_id", "habit__name", "date", "reflection")[:limit]
+    )
+    for log_id, habit_id, name, day, text in rows:
+        yield (day, HABIT, log_id), _reflection(habit_id, name, day, text)
+
+
+def _archived_reflections(user, cursor, limit):
+    """Archived reflections, one month of archive rows at a time; id = archive id * 32 + day."""
+    rows = HabitLogArchive.objects.filter(user=user).exclude(reflections={})
+    if cursor is not None:
+        rows = rows.filter(month__lte=cursor[0])
+    rows = rows.order_by("-month", "-id").values_list("id", "habit_id", "habit__name", "month", "reflections")
+
+    month, entries, produced = None, [], 0
+    for row_id, habit_id, name, row_month, reflections in rows.iterator(chunk_size=50):
+        if row_month != month:
+            # a month is complete once the next (older) one starts
+            for entry in sorted(entries, key=lambda e: e[0], reverse=True):
+                yield entry
+                produced += 1
+                if produced >= limit:
+                    return
+            month, entries = row_month, []
+        for day_of_month, text in reflections.items():
+            day = row_month.replace(day=int(day_of_month))
+            key = (day, ARCHIVED_HABIT, row_id * 32 + day.day)
+            if cursor is None or key < cursor:
+                entries.append((key, _reflection(habit_id, name, day, text)))
+
+    for entry in sorted(entries, key=lambda e: e[0], reverse=True)[:limit - produced]:
+        yield entry
+
+
+def page(user, cursor=None, limit=PAGE_SIZE):
+    """(entries, next_cursor or None) for one page of the user's journal, newest first."""
+    after = decode_cursor(cursor) if cursor else None
+    streams = [
+        source(user, after, limit + 1)
+        for source in (_notes, _checkins, _reflections, _archived_reflections)
+    ]
+    merged = list(islice(heapq.merge(*streams, key=lambda entry: entry[0], reverse=True), limit + 1))
+
+    entries = [entry for _, entry in merged[:limit]]
+    next_cursor = encode_cursor(merged[limit - 1][0]) if len(merged) > limit else None
+    return entries, next_cursor
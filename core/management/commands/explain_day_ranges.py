@@ -0,0 +1,69 @@
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt.models import DailyCheckIn
+from apps.us16_habit_tracking.models import HabitLog
+from core.models import DaySummary
+from core.querysets import month_bounds
+
+MODELS = [DayNote, HabitLog, DailyCheckIn, DaySummary]
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan and timing of a one-month for_user_range() read on each "
+        "per-day table, next to the old date__year/date__month filter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, dest="user_id",
+                            help="User id to query for (default: the user with the most notes).")
+        parser.add_argument("--month", help="YYYY-MM to read (default: this month).")
+        parser.add_argument("--runs", type=int, default=200, help="Timed runs per query.")
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"] or self._busiest_user()
+        if user_id is None:
+            raise CommandError("No users to query for.")
+
+        today = timezone.localdate()
+        try:
+            year, month = map(int, (options["month"] or f"{today.year}-{today.month}").split("-"))
+            start, end = month_bounds(year, month)
+        except ValueError:
+            raise CommandError("--month must be YYYY-MM.")
+
+        for model in MODELS:
+            self._report(
+                f"{model.__name__}.for_user_range",
+                model.objects.for_user_range(user_id, start, end),
+                options["runs"],
+            )
+        self._report(
+            "DayNote date__year/date__month",
+            DayNote.objects.filter(user_id=user_id, date__year=year, date__month=month),
+            options["runs"],
+        )
+
+    def _busiest_user(self):
+        row = (
+            DayNote.objects.values("user_id").order_by()
+            .annotate(n=Count("id")).order_by("-n").first()
+        )
+        return row["user_id"] if row else User.objects.order_by("id").values_list("id", flat=True).first()
+
+    def _report(self, label, queryset, runs):
+        queryset = queryset.order_by().values_list("date")
+        started = perf_counter()
+        for _ in range(runs):
+            list(queryset.all())  # fresh clone, no result cache
+        per_query = (perf_counter() - started) / runs * 1000
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{label}: {per_query:.3f} ms/query over {runs} runs"))
+        self.stdout.write(queryset.explain())
+        self.stdout.write("")
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cycle_import import detect_format, import_cycles
+
+
+class Command(BaseCommand):
+    help = "Import past periods for a user from a CSV (start_date,end_date), JSON or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+
+        fmt = options["format"] or detect_format(options["path"])
+        if fmt is None:
+            raise CommandError("Can't tell the file format; pass --format csv|json.")
+
+        try:
+            with open(options["path"], "rb") as f:
+                result = import_cycles(user, f, fmt)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} cycles ({result.duplicates} duplicates skipped, "
+            f"{result.error_count} rows rejected)."
+        ))
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core import summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild DaySummary rows from Cycle, DayNote, HabitLog and DailyCheckIn."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids",
+                            help="Only rebuild this user id (repeatable).")
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.order_by("id").values_list("id", flat=True)
+        if options["user_ids"]:
+            user_ids = user_ids.filter(id__in=options["user_ids"])
+
+        users = rows = 0
+        for user_id in user_ids.iterator():
+            rows += summaries.rebuild_user(user_id)
+            users += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} day summaries for {users} users."))
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django import db
+from django.core.management.base import BaseCommand
+
+from apps.us1_create_login.models import UserProfile
+from core import predictions
+
+DEFAULT_CHECKPOINT = os.path.join(tempfile.gettempdir(), "bloom_predictions_checkpoint.json")
+
+
+def _init_worker():
+    # forked children must not share the parent's DB connections
+    django.setup()
+    db.connections.close_all()
+
+
+def _recompute_chunk(user_ids):
+    return predictions.refresh_users(user_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute cycle predictions for every user, sharded across worker processes. "
+        "Progress is checkpointed so an interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (0 = run in this process).")
+        parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                            help="File recording the last fully processed user id.")
+        parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint.")
+
+    def handle(self, *args, **options):
+        self.checkpoint = options["checkpoint"]
+        after_id = 0 if options["restart"] else self._read_checkpoint()
+        if after_id:
+            self.stdout.write(f"Resuming after user id {after_id}.")
+
+        chunks = self._chunks(after_id, options["chunk_size"])
+        started = time.monotonic()
+
+        if options["workers"] == 0:
+            done = 0
+            for chunk in chunks:
+                done += _recompute_chunk(chunk)
+                self._write_checkpoint(chunk[-1])
+                self._report(done, started)
+        else:
+            db.connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+                done = self._run_pool(pool, chunks, options["workers"], started)
+
+        # a complete run leaves nothing to resume
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {done} users in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f} users/sec)."
+        ))
+
+    def _run_pool(self, pool, chunks, workers, started):
+        """
+        Keep at most 2x workers chunks in flight. Chunks finish out of order, so
+        the checkpoint only advances past a chunk once every earlier one is done.
+        """
+        pending = {}  # future -> last user id of its chunk
+        in_order = deque()  # last user ids in submission order
+        finished = set()
+        done = 0
+
+        for chunk in chunks:
+            future = pool.submit(_recompute_chunk, chunk)
+            pending[future] = chunk[-1]
+            in_order.append(chunk[-1])
+            if len(pending) >= workers * 2:
+                done += self._drain(pending, finished, in_order, FIRST_COMPLETED)
+                self._report(done, started)
+
+        done += self._drain(pending, finished, in_order, ALL_COMPLETED)
+        return done
+
+    def _drain(self, pending, finished, in_order, return_when):
+        completed, _ = wait(pending, return_when=return_when)
+        done = 0
+        for future in completed:
+            done += future.result()
+            finished.add(pending.pop(future))
+
+        last_safe = None
+        while in_order and in_order[0] in finished:
+            last_safe = in_order.popleft()
+            finished.discard(last_safe)
+        if last_safe is not None:
+            self._write_checkpoint(last_safe)
+        return done
+
+    def _chunks(self, after_id, size):
+        """Keyset-paginated user ids, one short query per chunk (no long-lived cursor)."""
+        while True:
+            chunk = list(
+                UserProfile.objects.filter(user_id__gt=after_id)
+                .order_by("user_id")
+                .values_list("user_id", flat=True)[:size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            after_id = chunk[-1]
+
+    def _report(self, done, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(f"  {done} users, {done / max(elapsed, 1e-9):.0f} users/sec")
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint) as f:
+                return json.load(f)["last_user_id"]
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _write_checkpoint(self, last_user_id):
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"last_user_id": last_user_id}, f)
+        os.replace(tmp, self.checkpoint)
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_cycle_core_cycle_user_start_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DaySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('flags', models.PositiveSmallIntegerField(default=0)),
+                ('note_count', models.PositiveIntegerField(default=0)),
+                ('habits_done', models.PositiveIntegerField(default=0)),
+                ('habits_total', models.PositiveIntegerField(default=0)),
+                ('checkin_status', models.CharField(blank=True, max_length=16)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='core_daysummary_user_date_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,163 @@
+"""
+Full-text search index (SQLite FTS5) over note titles/bodies, check-in
+responses and habit reflections (hot and archived), kept in sync by triggers
+so bulk writes, update() calls and cascading deletes are covered too.
+See core/search.py.
+
+rowid encodes the source row, so triggers find their entry without a scan:
+    note         id * 4
+    check-in     id * 4 + 1
+    habit log    id * 4 + 2
+    archived day (archive id * 32 + day of month) * 4 + 3
+"""
+
+from django.db import migrations
+
+CREATE = [
+    "CREATE VIRTUAL TABLE core_search USING fts5("
+    " title, body, kind UNINDEXED, source_id UNINDEXED, user_id UNINDEXED, date UNINDEXED,"
+    " tokenize = 'porter unicode61')",
+
+    # ── notes ──
+    """
+    CREATE TRIGGER core_search_note_insert AFTER INSERT ON us11_notes_daynote BEGIN
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        VALUES (NEW.id * 4, 'note', NEW.id, NEW.user_id, NEW.date, NEW.title, NEW.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_note_update AFTER UPDATE OF title, body, date ON us11_notes_daynote BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4;
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        VALUES (NEW.id * 4, 'note', NEW.id, NEW.user_id, NEW.date, NEW.title, NEW.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_note_delete AFTER DELETE ON us11_notes_daynote BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4;
+    END
+    """,
+
+    # ── check-in responses (only answered ones) ──
+    """
+    CREATE TRIGGER core_search_checkin_insert AFTER INSERT ON us13_checkin_prompt_dailycheckin
+    WHEN NEW.response_text != '' BEGIN
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        VALUES (NEW.id * 4 + 1, 'checkin', NEW.id, NEW.user_id, NEW.date, NEW.prompt_text, NEW.response_text);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_checkin_update AFTER UPDATE OF response_text, prompt_text ON us13_checkin_prompt_dailycheckin BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4 + 1;
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        SELECT NEW.id * 4 + 1, 'checkin', NEW.id, NEW.user_id, NEW.date, NEW.prompt_text, NEW.response_text
+        WHERE NEW.response_text != '';
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_checkin_delete AFTER DELETE ON us13_checkin_prompt_dailycheckin BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4 + 1;
+    END
+    """,
+
+    # ── habit reflections (title = habit name at the time of writing) ──
+    """
+    CREATE TRIGGER core_search_habitlog_insert AFTER INSERT ON us16_habit_tracking_habitlog
+    WHEN NEW.reflection != '' BEGIN
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        SELECT NEW.id * 4 + 2, 'habit', NEW.habit_id, NEW.user_id, NEW.date, name, NEW.reflection
+        FROM us16_habit_tracking_habit WHERE id = NEW.habit_id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_habitlog_update AFTER UPDATE OF reflection ON us16_habit_tracking_habitlog BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4 + 2;
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        SELECT NEW.id * 4 + 2, 'habit', NEW.habit_id, NEW.user_id, NEW.date, name, NEW.reflection
+        FROM us16_habit_tracking_habit WHERE id = NEW.habit_id AND NEW.reflection != '';
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_habitlog_delete AFTER DELETE ON us16_habit_tracking_habitlog BEGIN
+        DELETE FROM core_search WHERE rowid = OLD.id * 4 + 2;
+    END
+    """,
+
+    # ── archived reflections, one entry per day in the JSON ──
+    """
+    CREATE TRIGGER core_search_archive_insert AFTER INSERT ON us16_habit_tracking_habitlogarchive BEGIN
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        SELECT (NEW.id * 32 + CAST(r.key AS INTEGER)) * 4 + 3, 'habit', NEW.habit_id, NEW.user_id,
+               date(NEW.month, '+' || (CAST(r.key AS INTEGER) - 1) || ' days'), h.name, r.value
+        FROM json_each(NEW.reflections) r, us16_habit_tracking_habit h WHERE h.id = NEW.habit_id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_archive_update AFTER UPDATE OF reflections ON us16_habit_tracking_habitlogarchive BEGIN
+        DELETE FROM core_search WHERE rowid BETWEEN OLD.id * 128 AND OLD.id * 128 + 127 AND rowid % 4 = 3;
+        INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+        SELECT (NEW.id * 32 + CAST(r.key AS INTEGER)) * 4 + 3, 'habit', NEW.habit_id, NEW.user_id,
+               date(NEW.month, '+' || (CAST(r.key AS INTEGER) - 1) || ' days'), h.name, r.value
+        FROM json_each(NEW.reflections) r, us16_habit_tracking_habit h WHERE h.id = NEW.habit_id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_archive_delete AFTER DELETE ON us16_habit_tracking_habitlogarchive BEGIN
+        DELETE FROM core_search WHERE rowid BETWEEN OLD.id * 128 AND OLD.id * 128 + 127 AND rowid % 4 = 3;
+    END
+    """,
+
+    # ── index what already exists ──
+    """
+    INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+    SELECT id * 4, 'note', id, user_id, date, title, body FROM us11_notes_daynote
+    """,
+    """
+    INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+    SELECT id * 4 + 1, 'checkin', id, user_id, date, prompt_text, response_text
+    FROM us13_checkin_prompt_dailycheckin WHERE response_text != ''
+    """,
+    """
+    INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+    SELECT l.id * 4 + 2, 'habit', l.habit_id, l.user_id, l.date, h.name, l.reflection
+    FROM us16_habit_tracking_habitlog l JOIN us16_habit_tracking_habit h ON h.id = l.habit_id
+    WHERE l.reflection != ''
+    """,
+    """
+    INSERT INTO core_search(rowid, kind, source_id, user_id, date, title, body)
+    SELECT (a.id * 32 + CAST(r.key AS INTEGER)) * 4 + 3, 'habit', a.habit_id, a.user_id,
+           date(a.month, '+' || (CAST(r.key AS INTEGER) - 1) || ' days'), h.name, r.value
+    FROM us16_habit_tracking_habitlogarchive a
+    JOIN us16_habit_tracking_habit h ON h.id = a.habit_id, json_each(a.reflections) r
+    """,
+]
+
+DROP = [
+    f"DROP TRIGGER IF EXISTS core_search_{name}_{event}"
+    for name in ("note", "checkin", "habitlog", "archive")
+    for event in ("insert", "update", "delete")
+] + ["DROP TABLE IF EXISTS core_search"]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 and these triggers are SQLite-only; other backends go without search
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_daysummary"),
+        ("us11_notes", "0002_alter_daynote_options_alter_daynote_unique_together"),
+        ("us13_checkin_prompt", "0005_seed_checkin_prompts"),
+        ("us16_habit_tracking", "0010_habitrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE), _run(DROP)),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarEpoch',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendar_epoch', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('epoch', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
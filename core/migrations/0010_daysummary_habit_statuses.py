@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_calendarepoch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='daysummary',
+            name='habits_not_today',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='daysummary',
+            name='habits_partial',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,19 +1,54 @@
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
 
+from core.querysets import DayQuerySet
+
+# assume a 5-day period when a cycle has no end_date yet
+DEFAULT_PERIOD_LENGTH = 5
+
 
 class Cycle(models.Model):
+    """
+    One logged period. Write through core.cycles.save_cycle(), which also keeps
+    UserProfile.last_period_start current.
+    """
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     start_date = models.DateField()
     end_date = models.DateField(null = True, blank = True)
     created_at = models.DateTimeField(auto_now_add=True)
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+    class Meta:
+        indexes = [
+            # serves per-user start_date range scans (calendar windows, latest cycle)
+            models.Index(fields=["user", "start_date"], name="core_cycle_user_start_idx"),
+        ]
+
+    @staticmethod
+    def overlapping(start, end):
+        """
+        Q for cycles whose period touches [start, end] (inclusive).
+        Open cycles are treated as DEFAULT_PERIOD_LENGTH days long.
+        """
+        open_cutoff = start - timedelta(days=DEFAULT_PERIOD_LENGTH - 1)
+        return models.Q(start_date__lte=end) & (
+            models.Q(end_date__gte=start)
+            | models.Q(end_date__isnull=True, start_date__gte=open_cutoff)
+        )
 
-        profile = self.user.userprofile
-        profile.last_period_start = self.start_date
-        profile.save()
+    def period_days(self):
+        """Every day of this cycle's period (open cycles use DEFAULT_PERIOD_LENGTH)."""
+        return [
+            self.start_date + timedelta(days=offset)
+            for offset in range((self.effective_end_date() - self.start_date).days + 1)
+        ]
+
+    def effective_end_date(self):
+        if self.end_date:
+            return self.end_date
+        return self.start_date + timedelta(days=DEFAULT_PERIOD_LENGTH - 1)
 
     def calculate_length(self):
         if self.end_date:
@@ -23,7 +58,55 @@ class Cycle(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.start_date}"
 
-# Create your models here.
+
+class CalendarEpoch(models.Model):
+    """
+    Per-user counter bumped whenever something shown on the user's calendar
+    changes; cached month grids are keyed on it (see core/calendar_cache.py).
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="calendar_epoch")
+    epoch = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.epoch}"
+
+
+class DaySummary(models.Model):
+    """
+    One row per user per day that has any activity, kept up to date from the
+    Cycle/DayNote/HabitLog/DailyCheckIn write paths (core/summaries.py).
+    Rebuild with `python manage.py rebuild_day_summaries`.
+    """
+
+    # bits in `flags`
+    PERIOD = 1
+    NOTE = 2
+    HABIT = 4    # at least one habit logged (any status other than "none")
+    CHECKIN = 8  # check-in completed
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="day_summaries")
+    date = models.DateField()
+    flags = models.PositiveSmallIntegerField(default=0)
+    note_count = models.PositiveIntegerField(default=0)
+    habits_done = models.PositiveIntegerField(default=0)
+    habits_partial = models.PositiveIntegerField(default=0)
+    habits_not_today = models.PositiveIntegerField(default=0)
+    # active habits that existed that day, plus any other habit logged that day
+    habits_total = models.PositiveIntegerField(default=0)
+    checkin_status = models.CharField(max_length=16, blank=True)
+
+    objects = DayQuerySet.as_manager()
+
+    class Meta:
+        # the unique index doubles as the (user, date) range-scan index
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="core_daysummary_user_date_uniq"),
+        ]
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} [{self.flags}]"
 
 
 
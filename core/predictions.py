@@ -0,0 +1,240 @@
+"""
+core/predictions.py
+
+Cycle predictions from a user's Cycle history, computed with NumPy so a whole
+batch of users is handled in one pass (see predict_batch). Results are stored
+on UserProfile (predicted_* / next_period_* fields) and read from there by the
+dashboard and calendar; refresh_users() recomputes them after cycle writes.
+"""
+
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from apps.us1_create_login.models import UserProfile
+from core import calendar_cache
+from core.models import DEFAULT_PERIOD_LENGTH, Cycle
+
+DEFAULT_CYCLE_LENGTH = 28
+RECENT_CYCLES = 6                   # rolling window for mean/variance
+PLAUSIBLE_CYCLE_LENGTHS = (15, 60)  # gaps outside this are missed logs, not cycles
+LUTEAL_LENGTH = 14                  # ovulation ~14 days before the next period
+
+PHASES = {
+    "menstrual": ("Menstrual", "Your period has started."),
+    "follicular": ("Follicular", "Energy often rises as your body prepares."),
+    "ovulation": ("Ovulation", "Many people feel at their most energetic around now."),
+    "luteal": ("Luteal", "A good time to slow down and turn inward."),
+}
+_PHASE_SLUGS = np.array(list(PHASES))
+
+PREDICTION_FIELDS = [
+    "predicted_cycle_length",
+    "cycle_length_std",
+    "predicted_period_length",
+    "next_period_start",
+    "next_period_window_start",
+    "next_period_window_end",
+    "predictions_updated_at",
+]
+
+
+def predict_batch(user_ids, starts, ends, fallback_lengths=None):
+    """
+    Predict for many users at once.
+
+    user_ids, starts, ends are parallel sequences sorted by (user_id, start):
+    starts/ends are date ordinals, with 0 in `ends` for a cycle without an end.
+    fallback_lengths maps user_id -> UserProfile.avg_cycle_length, used when a
+    user has fewer than two usable cycles.
+
+    Returns {user_id: dict of PREDICTION_FIELDS values (minus the timestamp)}.
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if user_ids.size == 0:
+        return {}
+
+    # group index per row; rows of one user are contiguous
+    uniq, group = np.unique(user_ids, return_inverse=True)
+    n_groups = uniq.size
+    group_end = np.searchsorted(user_ids, uniq, side="right") - 1
+
+    # cycle lengths are gaps between consecutive starts of the same user
+    lengths = np.diff(starts)
+    same_user = group[1:] == group[:-1]
+    low, high = PLAUSIBLE_CYCLE_LENGTHS
+    usable = same_user & (lengths >= low) & (lengths <= high)
+
+    # only the most recent RECENT_CYCLES gaps of each user count
+    gap_group = group[1:]
+    rank_from_end = group_end[gap_group] - np.arange(1, starts.size)
+    usable &= rank_from_end < RECENT_CYCLES
+
+    weights = usable.astype(np.float64)
+    count = np.bincount(gap_group, weights=weights, minlength=n_groups)
+    total = np.bincount(gap_group, weights=lengths * weights, minlength=n_groups)
+    total_sq = np.bincount(gap_group, weights=lengths ** 2 * weights, minlength=n_groups)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+
+    fallback = np.array(
+        [(fallback_lengths or {}).get(int(u)) or DEFAULT_CYCLE_LENGTH for u in uniq],
+        dtype=np.float64,
+    )
+    has_history = count >= 1
+    mean = np.where(has_history, mean, fallback)
+    std = np.where(count >= 2, std, np.nan)
+
+    # period length: mean of logged (closed) periods
+    closed = ends > 0
+    period_count = np.bincount(group, weights=closed.astype(np.float64), minlength=n_groups)
+    period_total = np.bincount(group, weights=np.where(closed, ends - starts + 1, 0), minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        period_length = np.where(period_count > 0, np.rint(period_total / period_count), DEFAULT_PERIOD_LENGTH)
+
+    last_start = starts[group_end]
+    next_start = last_start + np.rint(mean).astype(np.int64)
+    spread = np.where(np.isnan(std), 2, np.maximum(1, np.rint(std))).astype(np.int64)
+
+    results = {}
+    for i, user_id in enumerate(uniq.tolist()):
+        results[user_id] = {
+            "predicted_cycle_length": round(float(mean[i]), 2),
+            "cycle_length_std": None if np.isnan(std[i]) else round(float(std[i]), 2),
+            "predicted_period_length": int(period_length[i]),
+            "next_period_start": date.fromordinal(int(next_start[i])),
+            "next_period_window_start": date.fromordinal(int(next_start[i] - spread[i])),
+            "next_period_window_end": date.fromordinal(int(next_start[i] + spread[i])),
+        }
+    return results
+
+
+def phases_for_days(days_of_cycle, cycle_length, period_length):
+    """Phase slug for each 1-based day of the cycle (array in, array out)."""
+    days = np.asarray(days_of_cycle)
+    ovulation_day = max(int(round(cycle_length)) - LUTEAL_LENGTH, period_length + 1)
+    index = np.select(
+        [days <= period_length, days < ovulation_day - 1, days <= ovulation_day + 1],
+        [0, 1, 2],
+        default=3,
+    )
+    return _PHASE_SLUGS[index]
+
+
+def phase_for_day(day_of_cycle, cycle_length, period_length):
+    return str(phases_for_days([day_of_cycle], cycle_length, period_length)[0])
+
+
+def load_histories(user_ids):
+    """(user_ids, starts, ends) arrays for the given users in one query."""
+    rows = (
+        Cycle.objects.filter(user_id__in=user_ids)
+        .order_by("user_id", "start_date")
+        .values_list("user_id", "start_date", "end_date")
+    )
+    users, starts, ends = [], [], []
+    for user_id, start, end in rows:
+        users.append(user_id)
+        starts.append(start.toordinal())
+        ends.append(end.toordinal() if end else 0)
+    return users, starts, ends
+
+
+def apply_predictions(profiles, predictions, now=None):
+    """
+    Copy predictions onto UserProfile instances (not saved). Profiles without
+    cycle history get a prediction from onboarding data, or none at all.
+    """
+    now = now or timezone.now()
+    for profile in profiles:
+        prediction = predictions.get(profile.user_id)
+        if prediction is None and profile.last_period_start:
+            start = profile.last_period_start
+            prediction = predict_batch(
+                [profile.user_id], [start.toordinal()], [0], {profile.user_id: profile.avg_cycle_length},
+            )[profile.user_id]
+        for field in PREDICTION_FIELDS[:-1]:
+            setattr(profile, field, prediction[field] if prediction else None)
+        profile.predictions_updated_at = now
+    return profiles
+
+
+def refresh_users(user_ids):
+    """
+    Recompute and store predictions for the given users: one query for their
+    profiles, one for their cycles, one bulk UPDATE and one epoch UPDATE, in a
+    single transaction. Returns profiles updated.
+    """
+    profiles = list(UserProfile.objects.filter(user_id__in=user_ids))
+    predictions = predict_batch(
+        *load_histories(user_ids),
+        fallback_lengths={p.user_id: p.avg_cycle_length for p in profiles},
+    )
+    apply_predictions(profiles, predictions)
+    # joins the caller's transaction (save_cycle, import) without a savepoint
+    with transaction.atomic(savepoint=False):
+        UserProfile.objects.bulk_update(profiles, PREDICTION_FIELDS)
+        # the calendar grid shows predicted days
+        calendar_cache.bump_epochs(user_ids)
+    return len(profiles)
+
+
+def cycle_info(profile, today=None, latest_cycle_start=None):
+    """
+    Dashboard snapshot built from the stored predictions (no Cycle queries).
+    latest_cycle_start, when the caller already has it, wins over a stale profile.
+    """
+    today = today or date.today()
+    starts = [d for d in (latest_cycle_start, profile and profile.last_period_start) if d]
+    if not profile or not starts:
+        return None
+
+    cycle_length = profile.predicted_cycle_length or profile.avg_cycle_length or DEFAULT_CYCLE_LENGTH
+    period_length = profile.predicted_period_length or DEFAULT_PERIOD_LENGTH
+    day_of_cycle = (today - max(starts)).days + 1
+
+    slug = phase_for_day(day_of_cycle, cycle_length, period_length)
+    name, description = PHASES[slug]
+
+    if profile.next_period_start:
+        days_until = max(0, (profile.next_period_start - today).days)
+    else:
+        days_until = max(0, int(round(cycle_length)) - day_of_cycle + 1)
+
+    return {
+        "phase_name": name,
+        "phase_slug": slug,
+        "phase_description": description,
+        "day_of_cycle": day_of_cycle,
+        "period_length": period_length,
+        "days_until_next_period": days_until,
+        "next_period_window_start": profile.next_period_window_start,
+        "next_period_window_end": profile.next_period_window_end,
+    }
+
+
+def predicted_days(profile, start, end):
+    """Predicted period days in [start, end] (inclusive), projected forward cycle by cycle."""
+    if not profile or not profile.next_period_start:
+        return set()
+
+    cycle_length = max(1, int(round(profile.predicted_cycle_length or DEFAULT_CYCLE_LENGTH)))
+    period_length = profile.predicted_period_length or DEFAULT_PERIOD_LENGTH
+
+    first = profile.next_period_start.toordinal()
+    if start.toordinal() > first:
+        # jump straight to the first predicted cycle that can reach the window
+        skipped = (start.toordinal() - first) // cycle_length
+        first += skipped * cycle_length
+
+    offsets = np.arange(period_length)
+    cycle_starts = np.arange(first, end.toordinal() + 1, cycle_length)
+    ordinals = (cycle_starts[:, None] + offsets[None, :]).ravel()
+    ordinals = ordinals[(ordinals >= start.toordinal()) & (ordinals <= end.toordinal())]
+    return {date.fromordinal(int(o)) for o in ordinals}
@@ -0,0 +1,31 @@
+"""
+core/querysets.py
+
+Shared QuerySet for the per-user day tables (DayNote, HabitLog, DailyCheckIn,
+DaySummary). Reads go through for_user_range(), which emits plain
+`user_id = ? AND date >= ? AND date < ?` so the (user, date) indexes serve
+them; date__year / date__month compile to function calls on the column and
+can't use an index on SQLite.
+"""
+
+from datetime import date, timedelta
+
+from django.db import models
+
+ONE_DAY = timedelta(days=1)
+
+
+class DayQuerySet(models.QuerySet):
+    def for_user_range(self, user, start, end):
+        """Rows of `user` (instance, id or OuterRef) with start <= date < end."""
+        return self.filter(user=user, date__gte=start, date__lt=end)
+
+    def for_user_day(self, user, day):
+        return self.for_user_range(user, day, day + ONE_DAY)
+
+
+def month_bounds(year, month):
+    """[first day of the month, first day of the next month)."""
+    start = date(year, month, 1)
+    end = start.replace(year=year + 1, month=1) if month == 12 else start.replace(month=month + 1)
+    return start, end
@@ -0,0 +1,128 @@
+"""
+core/search.py
+
+Full-text search over a user's notes, check-in answers and habit reflections,
+backed by the core_search FTS5 table (created and kept in sync by triggers in
+migrations 0008 and 0011). Entries carry their owner as an indexed token, so
+the user filter is part of the MATCH and FTS5 never reads other users' rows.
+Results are ranked with bm25 (title hits count more), paged with a keyset
+cursor on (score, rowid), and snippets are cut and marked by SQLite itself.
+"""
+
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db import connection
+from django.urls import reverse
+from django.utils.html import escape
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+TITLE_WEIGHT, BODY_WEIGHT, OWNER_WEIGHT = 5.0, 1.0, 0.0
+SNIPPET_TOKENS = 16
+
+# SQLite wraps hits in these; they become <mark> after the text is HTML-escaped
+_HIT_START, _HIT_END = "\x02", "\x03"
+_WORD = re.compile(r"\w+")
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    """User input -> FTS5 query: every word must match, the last one as a prefix."""
+    words = _WORD.findall(query or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    # text columns only: words must never match the owner tokens
+    return "{title body} : (" + " ".join(terms) + ")"
+
+
+def owned_by(user_id, match):
+    """Restrict a match_expression() to entries of user_id (the indexed owner column)."""
+    return f'owner : "u{int(user_id)}" AND {match}'
+
+
+def encode_cursor(score, rowid):
+    return urlsafe_b64encode(f"{score!r}:{rowid}".encode()).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """(score, rowid) from a cursor; ValueError if it was tampered with."""
+    try:
+        score, rowid = urlsafe_b64decode(cursor.encode("ascii")).decode().split(":")
+        return float(score), int(rowid)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _url(kind, source_id, day):
+    if kind == "note":
+        return reverse("notes_for_day", args=[day])
+    if kind == "habit":
+        return f"{reverse('habit_reflection', args=[source_id])}?date={day}"
+    return None
+
+
+def search(user_id, query, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of results, best first: (results, next_cursor or None).
+    Two queries: the ranked page of rowids, then snippets for just that page.
+    """
+    match = match_expression(query)
+    if match is None:
+        return [], None
+
+    weights = [TITLE_WEIGHT, BODY_WEIGHT, OWNER_WEIGHT]
+    keyset, params = "", [*weights, owned_by(user_id, match)]
+    if cursor:
+        score, rowid = decode_cursor(cursor)
+        keyset = "AND (bm25(core_search, %s, %s, %s) > %s OR (bm25(core_search, %s, %s, %s) = %s AND rowid > %s))"
+        params += [*weights, score, *weights, score, rowid]
+
+    with connection.cursor() as db:
+        db.execute(
+            f"""
+            SELECT rowid, bm25(core_search, %s, %s, %s) AS score
+            FROM core_search
+            WHERE core_search MATCH %s {keyset}
+            ORDER BY score, rowid
+            LIMIT %s
+            """,
+            [*params, limit + 1],
+        )
+        page = db.fetchall()
+        has_more = len(page) > limit
+        page = page[:limit]
+        if not page:
+            return [], None
+
+        rowids = [rowid for rowid, _ in page]
+        # words only, so snippet() never picks the owner column
+        db.execute(
+            f"""
+            SELECT rowid, kind, source_id, date, title,
+                   snippet(core_search, -1, %s, %s, '…', %s)
+            FROM core_search
+            WHERE core_search MATCH %s AND rowid IN ({", ".join(["%s"] * len(rowids))})
+            """,
+            [_HIT_START, _HIT_END, SNIPPET_TOKENS, match, *rowids],
+        )
+        rows = {row[0]: row[1:] for row in db.fetchall()}
+
+    results = []
+    for rowid, _ in page:
+        kind, source_id, day, title, snippet = rows[rowid]
+        results.append({
+            "kind": kind,
+            "date": day,
+            "title": title,
+            "snippet": escape(snippet).replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>"),
+            "url": _url(kind, source_id, day),
+        })
+
+    last_rowid, last_score = page[-1]
+    return results, encode_cursor(last_score, last_rowid) if has_more else None
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt import prompts
+from apps.us13_checkin_prompt.models import CheckInPrompt, DailyCheckIn
+from apps.us16_habit_tracking import catalog
+from apps.us16_habit_tracking.models import HabitLog, HabitTemplate
+from core import calendar_cache, predictions, summaries
+from core.models import Cycle
+
+
+def _deleting_user(origin):
+    """True while a User delete cascades; their summaries are going away too."""
+    return isinstance(origin, User) or getattr(origin, "model", None) is User
+
+
+def _cascaded(instance, origin):
+    """
+    True when `instance` goes as part of deleting some other object (a User or
+    Habit); whoever started that delete refreshes the affected days once.
+    """
+    return origin is not None and getattr(origin, "model", type(origin)) is not type(instance)
+
+
+# ── DaySummary maintenance ────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Cycle)
+def remember_old_period_days(sender, instance, **kwargs):
+    """Keep the pre-edit period days so moving a cycle clears the old ones."""
+    instance._old_period_days = []
+    if instance.pk:
+        old = Cycle.objects.filter(pk=instance.pk).only("start_date", "end_date").first()
+        if old:
+            instance._old_period_days = old.period_days()
+
+
+@receiver(post_save, sender=Cycle)
+def summarize_cycle_save(sender, instance, **kwargs):
+    old_days = getattr(instance, "_old_period_days", [])
+    summaries.refresh_days(instance.user_id, [*old_days, *instance.period_days()])
+
+
+@receiver(post_delete, sender=Cycle)
+def summarize_cycle_delete(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        summaries.refresh_days(instance.user_id, instance.period_days())
+
+
+@receiver(post_save, sender=DayNote)
+@receiver(post_save, sender=HabitLog)
+@receiver(post_save, sender=DailyCheckIn)
+def summarize_day_save(sender, instance, **kwargs):
+    summaries.refresh_days(instance.user_id, [instance.date])
+
+
+@receiver(post_delete, sender=DayNote)
+@receiver(post_delete, sender=HabitLog)
+@receiver(post_delete, sender=DailyCheckIn)
+def summarize_day_delete(sender, instance, origin=None, **kwargs):
+    if not _cascaded(instance, origin):
+        summaries.refresh_days(instance.user_id, [instance.date])
+
+
+# ── Calendar grid cache ───────────────────────────────────────────────────────
+# connected after the summary receivers: grids are rendered from DaySummary
+
+@receiver([post_save, post_delete], sender=DayNote)
+def bump_calendar_epoch(sender, instance, origin=None, **kwargs):
+    """Any change to a user's notes invalidates their cached calendar months."""
+    if not _deleting_user(origin):
+        calendar_cache.bump_epoch(instance.user_id)
+
+
+# ── Cycle predictions ─────────────────────────────────────────────────────────
+# save_cycle() refreshes predictions inside its own transaction; deletes land
+# here. refresh_users() also bumps the calendar epoch (predicted days), so
+# Cycle changes need no separate bump.
+
+@receiver(post_delete, sender=Cycle)
+def repredict_on_delete(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        predictions.refresh_users([instance.user_id])
+
+
+# ── Habit library catalog ─────────────────────────────────────────────────────
+
+@receiver([post_save, post_delete], sender=HabitTemplate)
+def bump_habit_catalog(sender, instance, **kwargs):
+    catalog.bump_version()
+
+
+# ── Check-in prompt bank ──────────────────────────────────────────────────────
+
+@receiver([post_save, post_delete], sender=CheckInPrompt)
+def bump_prompt_bank(sender, instance, **kwargs):
+    prompts.bump_version()
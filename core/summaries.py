@@ -0,0 +1,134 @@
+"""
+core/summaries.py
+
+Maintains DaySummary rows. Write paths call refresh_days() with the days they
+touched; rebuild_user() recomputes a user's whole history in bulk. Adding,
+pausing or removing a habit changes habits_total from its creation day on
+(refresh_since).
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt.models import DailyCheckIn
+from apps.us16_habit_tracking import archive
+from apps.us16_habit_tracking.models import Habit, HabitLog
+from core.models import Cycle, DaySummary
+from core.querysets import ONE_DAY
+
+SUMMARY_FIELDS = [
+    "flags", "note_count", "habits_done", "habits_partial", "habits_not_today", "habits_total", "checkin_status",
+]
+HABIT_COUNTS = {
+    HabitLog.Status.DONE: "habits_done",
+    HabitLog.Status.PARTIAL: "habits_partial",
+    HabitLog.Status.NOT_TODAY: "habits_not_today",
+}
+BATCH_SIZE = 1000
+
+
+def _collect(user_id, start=None, end=None):
+    """
+    date -> DaySummary field values for every day with activity in
+    [start, end] (whole history when start/end are None).
+    """
+    def in_range(model):
+        rows = model.objects
+        return rows.for_user_range(user_id, start, end + ONE_DAY) if start else rows.filter(user_id=user_id)
+
+    days = defaultdict(lambda: {
+        "flags": 0, "note_count": 0, "habits_done": 0, "habits_partial": 0, "habits_not_today": 0,
+        "habits_total": 0, "checkin_status": "",
+    })
+
+    cycles = Cycle.objects.filter(user_id=user_id).only("start_date", "end_date")
+    if start:
+        cycles = cycles.filter(Cycle.overlapping(start, end))
+    for cycle in cycles:
+        for day in cycle.period_days():
+            if not start or start <= day <= end:
+                days[day]["flags"] |= DaySummary.PERIOD
+
+    note_counts = (
+        in_range(DayNote)
+        .values("date").annotate(n=Count("id")).order_by()
+    )
+    for row in note_counts:
+        days[row["date"]]["note_count"] = row["n"]
+        days[row["date"]]["flags"] |= DaySummary.NOTE
+
+    # archived months never overlap hot rows, so their logs simply add up
+    hot = (
+        in_range(HabitLog).filter(status__in=HABIT_COUNTS)
+        .order_by()  # HabitLog's default ordering joins Habit and sorts; nothing here needs it
+        .values_list("habit_id", "date", "status")
+    )
+    cold = archive.cold_logs(user_id=user_id, start=start, end=end)
+    logged = defaultdict(set)
+    for habit_id, day, status, *_ in chain(hot, cold):
+        if status in HABIT_COUNTS:
+            days[day][HABIT_COUNTS[status]] += 1
+            days[day]["flags"] |= DaySummary.HABIT
+            logged[day].add(habit_id)
+
+    checkins = in_range(DailyCheckIn).order_by().values_list("date", "status")
+    for day, status in checkins:
+        days[day]["checkin_status"] = status
+        if status == DailyCheckIn.STATUS_COMPLETED:
+            days[day]["flags"] |= DaySummary.CHECKIN
+
+    # a habit counts towards a day's total from the day it was added while it's
+    # active; paused or removed habits only count on days they were logged
+    active = {
+        habit_id: timezone.localdate(created_at)
+        for habit_id, created_at in Habit.objects.filter(user_id=user_id, is_active=True).values_list("id", "created_at")
+    }
+    added_on = sorted(active.values())
+    for day, fields in days.items():
+        extra = sum(1 for habit_id in logged[day] if habit_id not in active or active[habit_id] > day)
+        fields["habits_total"] = bisect_right(added_on, day) + extra
+
+    return days
+
+
+def refresh_days(user_id, days):
+    """Recompute the summaries for `days` (any iterable of dates) for one user."""
+    days = set(days)
+    if not days:
+        return
+
+    values = _collect(user_id, min(days), max(days))
+    rows = [DaySummary(user_id=user_id, date=day, **values[day]) for day in days if day in values]
+
+    with transaction.atomic():
+        # days that no longer have any activity drop out of the table
+        DaySummary.objects.filter(user_id=user_id, date__in=days - values.keys()).delete()
+        DaySummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "date"],
+            update_fields=SUMMARY_FIELDS,
+        )
+
+
+def refresh_since(user_id, start, days=()):
+    """Recompute `days` plus every summarised day from `start` on (habit added, paused or removed)."""
+    existing = DaySummary.objects.filter(user_id=user_id, date__gte=start).values_list("date", flat=True)
+    refresh_days(user_id, [*existing, *days])
+
+
+def rebuild_user(user_id):
+    """Replace all of a user's summaries from the source tables. Returns the row count."""
+    values = _collect(user_id)
+    rows = [DaySummary(user_id=user_id, date=day, **fields) for day, fields in values.items()]
+
+    with transaction.atomic():
+        DaySummary.objects.filter(user_id=user_id).delete()
+        DaySummary.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
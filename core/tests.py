@@ -1,3 +1,615 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import zipfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.us11_notes.models import DayNote
+from apps.us13_checkin_prompt import prompts
+from apps.us13_checkin_prompt.models import CheckInPromptVersion, DailyCheckIn
+from apps.us16_habit_tracking import archive, catalog
+from apps.us16_habit_tracking.models import Habit, HabitCatalogVersion, HabitLog
+from apps.us1_create_login.models import UserProfile
+from core import cycle_import, journal, predictions, search
+from core.cycle_import import detect_format, import_cycles
+from core.cycles import save_cycle
+from core.export import SOURCES
+from core.dashboard import load_dashboard
+from core.models import CalendarEpoch, Cycle, DaySummary
+from core.predictions import RECENT_CYCLES, predict_batch
+from core.querysets import month_bounds
+from core.versioned import VersionedCache
+from core.views import dashboard
+
+
+class DashboardQueryBudgetTests(TestCase):
+    """The dashboard must stay within two queries however much data a user has."""
+
+    def setUp(self):
+        self.today = date.today()
+        self.user = User.objects.create_user("bloom", password="pw")
+        UserProfile.objects.create(user=self.user, avg_cycle_length=28, last_period_start=self.today)
+        Cycle.objects.bulk_create([
+            Cycle(user=self.user, start_date=self.today - timedelta(days=28 * i)) for i in range(12)
+        ])
+        habits = [Habit.objects.create(user=self.user, name=f"Habit {i}") for i in range(4)]
+        HabitLog.objects.create(user=self.user, habit=habits[0], date=self.today, status=HabitLog.Status.DONE)
+        HabitLog.objects.create(user=self.user, habit=habits[1], date=self.today, status=HabitLog.Status.PARTIAL)
+        DailyCheckIn.objects.create(user=self.user, date=self.today, prompt_text="How are you?")
+
+    def test_loader_query_budget(self):
+        with self.assertNumQueries(2):
+            data = load_dashboard(self.user, self.today)
+
+        self.assertEqual(data["profile"].avg_cycle_length, 28)
+        self.assertEqual(data["latest_cycle"]["start_date"], self.today)
+        self.assertEqual(data["checkin"].prompt_text, "How are you?")
+        self.assertEqual(data["habits"], {"active": 4, "done": 1, "partial": 1, "not_today": 0})
+
+    def test_loader_without_profile_or_history(self):
+        other = User.objects.create_user("new", password="pw")
+        with self.assertNumQueries(2):
+            data = load_dashboard(other, self.today)
+
+        self.assertIsNone(data["profile"])
+        self.assertIsNone(data["latest_cycle"])
+        self.assertIsNone(data["checkin"])
+        self.assertEqual(data["habits"]["active"], 0)
+
+    def test_view_query_budget(self):
+        request = RequestFactory().get("/dashboard/")
+        request.user = self.user
+
+        # loader queries only: templates and the check-in context processor reuse them
+        with self.assertNumQueries(2):
+            response = dashboard(request)
+
+        self.assertContains(response, "Day 1 of your cycle")
+        self.assertContains(response, "1 of 4 done")
+
+
+class DayRangeQueryPlanTests(TestCase):
+    """for_user_range() must be answered from a (user, date) index, not a scan."""
+
+    @skipUnlessDBFeature("supports_explaining_query_execution")
+    def test_month_reads_use_user_date_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text below is SQLite's EXPLAIN QUERY PLAN")
+
+        user = User.objects.create_user("bloom", password="pw")
+        start, end = month_bounds(2026, 2)
+        for model in (DayNote, HabitLog, DailyCheckIn, DaySummary):
+            with self.subTest(model=model.__name__):
+                plan = model.objects.for_user_range(user, start, end).values_list("date").explain()
+                self.assertIn("INDEX", plan)
+                self.assertIn("user_id=? AND date>? AND date<?", plan)
+
+
+class SaveCycleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        UserProfile.objects.create(user=self.user, avg_cycle_length=30)
+
+    def test_profile_predictions_and_calendar_follow_in_one_pass(self):
+        save_cycle(self.user, date(2026, 1, 1))
+        epoch = CalendarEpoch.objects.get(user=self.user).epoch
+
+        with CaptureQueriesContext(connection) as ctx:
+            save_cycle(self.user, date(2026, 1, 29), date(2026, 2, 2))
+
+        self.assertEqual(sum("core_calendarepoch" in q["sql"] for q in ctx.captured_queries), 1)
+        self.assertEqual(CalendarEpoch.objects.get(user=self.user).epoch, epoch + 1)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.last_period_start, date(2026, 1, 29))
+        self.assertEqual(profile.predicted_cycle_length, 28.0)
+        self.assertEqual(profile.next_period_start, date(2026, 2, 26))
+
+    def test_end_before_start_writes_nothing(self):
+        with self.assertRaises(ValueError):
+            save_cycle(self.user, date(2026, 1, 10), date(2026, 1, 5))
+        self.assertFalse(Cycle.objects.exists())
+        self.assertIsNone(UserProfile.objects.get(user=self.user).predictions_updated_at)
+
+
+    def test_log_period_rejects_an_impossible_date(self):
+        self.client.login(username="bloom", password="pw")
+        response = self.client.post(reverse("log_period"), {"start_date": "2026-02-30"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Please enter a valid start date.")
+        self.assertFalse(Cycle.objects.exists())
+
+
+class CycleImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.profile = UserProfile.objects.create(user=self.user, avg_cycle_length=28)
+
+    def _import(self, content, fmt):
+        return import_cycles(self.user, io.BytesIO(content.encode()), fmt)
+
+    def test_csv_rows_are_created_and_follow_up_work_runs_once(self):
+        result = self._import(
+            "start_date,end_date\n2026-01-01,2026-01-05\n2026-01-30,\n2026-02-28,2026-03-03\n", "csv"
+        )
+
+        self.assertEqual((result.created, result.duplicates, result.error_count), (3, 0, 0))
+        self.assertEqual(Cycle.objects.filter(user=self.user).count(), 3)
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.last_period_start, date(2026, 2, 28))
+        self.assertEqual(self.profile.next_period_start, date(2026, 2, 28) + timedelta(days=29))
+        self.assertEqual(
+            DaySummary.objects.filter(user=self.user, flags=DaySummary.PERIOD).count(), 5 + 5 + 4
+        )
+
+    def test_json_array_and_json_lines(self):
+        rows = [{"start_date": "2026-01-01", "end_date": "2026-01-04"}, {"start_date": "2026-02-01"}]
+        self.assertEqual(self._import(json.dumps(rows), "json").created, 2)
+
+        lines = "\n".join(json.dumps({"start_date": f"2025-{m:02d}-01"}) for m in range(1, 4))
+        self.assertEqual(self._import(lines, "json").created, 3)
+        self.assertEqual(Cycle.objects.filter(user=self.user).count(), 5)
+
+    def test_json_objects_split_across_reads(self):
+        rows = [{"start_date": (date(2000, 1, 1) + timedelta(days=28 * i)).isoformat()} for i in range(300)]
+        with mock.patch.object(cycle_import, "READ_SIZE", 16):
+            result = self._import(json.dumps(rows), "json")
+
+        self.assertEqual(result.created, 300)
+
+    def test_duplicates_and_bad_rows_are_counted_not_imported(self):
+        Cycle.objects.create(user=self.user, start_date=date(2026, 1, 1))
+        result = self._import(
+            "start_date,end_date\n"
+            "2026-01-01,\n"            # already stored
+            "2026-02-01,\n"
+            "2026-02-01,\n"            # repeated in the file
+            "not-a-date,\n"
+            "2026-03-01,2026-02-01\n"  # ends before it starts
+            "2026-04-01,04/05/2026\n",
+            "csv",
+        )
+
+        self.assertEqual((result.created, result.duplicates, result.error_count), (1, 2, 3))
+        self.assertEqual(result.errors[0], "Row 4: missing or invalid start_date (use YYYY-MM-DD)")
+        self.assertEqual(Cycle.objects.filter(user=self.user).count(), 2)
+
+    def test_impossible_dates_are_row_errors(self):
+        result = self._import(
+            "start_date,end_date\n2026-02-30,\n2026-03-01,2026-03-32\n2026-04-01,2026-04-05\n", "csv"
+        )
+
+        self.assertEqual((result.created, result.error_count), (1, 2))
+        self.assertEqual(result.errors, [
+            "Row 1: missing or invalid start_date (use YYYY-MM-DD)",
+            "Row 2: invalid end_date (use YYYY-MM-DD)",
+        ])
+        self.assertEqual(
+            list(Cycle.objects.filter(user=self.user).values_list("start_date", flat=True)), [date(2026, 4, 1)]
+        )
+
+    def test_reported_errors_are_capped(self):
+        result = self._import("start_date\n" + "bad\n" * 50, "csv")
+        self.assertEqual(result.error_count, 50)
+        self.assertEqual(len(result.errors), cycle_import.MAX_REPORTED_ERRORS)
+
+    def test_invalid_json_raises(self):
+        with self.assertRaises(ValueError):
+            self._import('[{"start_date": "2026-01-01"', "json")
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("export.CSV"), "csv")
+        self.assertEqual(detect_format("log.ndjson"), "json")
+        self.assertIsNone(detect_format("notes.txt"))
+        self.assertIsNone(detect_format(None))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        other = User.objects.create_user("other", password="pw")
+        Cycle.objects.create(user=self.user, start_date=date(2026, 1, 1), end_date=date(2026, 1, 5))
+        Cycle.objects.create(user=other, start_date=date(2026, 1, 2))
+        DayNote.objects.create(user=self.user, date=date(2026, 1, 3), body="cramps, tea helped")
+
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+        HabitLog.objects.create(user=self.user, habit=self.habit, date=date(2020, 3, 2), status=HabitLog.Status.DONE)
+        HabitLog.objects.create(
+            user=self.user, habit=self.habit, date=date(2020, 3, 9), status=HabitLog.Status.NONE, reflection="rain",
+        )
+        HabitLog.objects.create(user=self.user, habit=self.habit, date=date.today(), status=HabitLog.Status.PARTIAL)
+        archive.archive_before(date(2021, 1, 1))
+        self.client.force_login(self.user)
+
+    def _lines(self, response):
+        body = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_ndjson_holds_only_the_users_rows(self):
+        response = self.client.get("/export/")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="bloom-export-bloom.ndjson"', response["Content-Disposition"])
+        by_type = {}
+        for record in self._lines(response):
+            by_type.setdefault(record.pop("type"), []).append(record)
+
+        self.assertEqual([c["start_date"] for c in by_type["cycles"]], ["2026-01-01"])
+        self.assertEqual(by_type["day_notes"][0]["body"], "cramps, tea helped")
+        self.assertEqual([log["status"] for log in by_type["habit_logs"]], ["partial"])
+        self.assertEqual(
+            [(log["date"], log["status"], log["reflection"]) for log in by_type["archived_habit_logs"]],
+            [("2020-03-02", "done", ""), ("2020-03-09", "none", "rain")],
+        )
+
+    def test_zip_has_one_csv_per_source(self):
+        response = self.client.get("/export/?format=zip")
+
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as zf:
+            self.assertEqual(zf.namelist(), [f"{name}.csv" for name, _, _ in SOURCES])
+            for name, _, fields in SOURCES:
+                with self.subTest(source=name):
+                    rows = list(csv.reader(io.TextIOWrapper(zf.open(f"{name}.csv"), encoding="utf-8")))
+                    self.assertEqual(rows[0], fields)
+            archived = list(csv.reader(io.TextIOWrapper(zf.open("archived_habit_logs.csv"), encoding="utf-8")))
+
+        habit_id = str(self.habit.id)
+        self.assertEqual(archived[1:], [[habit_id, "2020-03-02", "done", ""], [habit_id, "2020-03-09", "none", "rain"]])
+
+    def test_zip_spanning_several_yields(self):
+        Cycle.objects.bulk_create([
+            Cycle(user=self.user, start_date=date(2000, 1, 1) + timedelta(days=28 * i)) for i in range(120)
+        ])
+        with mock.patch("core.export.ROWS_PER_YIELD", 7):
+            chunks = list(self.client.get("/export/?format=zip").streaming_content)
+
+        self.assertGreater(len(chunks), 20)
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            self.assertEqual(len(zf.read("cycles.csv").decode().splitlines()), 1 + 121)
+
+    def test_unknown_format(self):
+        response = self.client.get("/export/?format=xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "format must be ndjson or zip"})
+
+
+def _history(user_id, starts, period_length=None):
+    """predict_batch inputs for one user: cycles starting on the given dates."""
+    ends = [(d + timedelta(days=period_length - 1)).toordinal() if period_length else 0 for d in starts]
+    return [user_id] * len(starts), [d.toordinal() for d in starts], ends
+
+
+class PredictBatchTests(SimpleTestCase):
+    start = date(2026, 1, 1)
+
+    def _starts(self, gaps):
+        starts = [self.start]
+        for gap in gaps:
+            starts.append(starts[-1] + timedelta(days=gap))
+        return starts
+
+    def test_mean_and_spread_from_recent_gaps(self):
+        starts = self._starts([28, 30, 26, 28])
+        result = predict_batch(*_history(1, starts, period_length=5))[1]
+
+        self.assertEqual(result["predicted_cycle_length"], 28.0)
+        self.assertEqual(result["cycle_length_std"], 1.41)
+        self.assertEqual(result["predicted_period_length"], 5)
+        self.assertEqual(result["next_period_start"], starts[-1] + timedelta(days=28))
+        self.assertEqual(result["next_period_window_start"], starts[-1] + timedelta(days=27))
+        self.assertEqual(result["next_period_window_end"], starts[-1] + timedelta(days=29))
+
+    def test_only_the_most_recent_gaps_count(self):
+        # old 40-day cycles fall out of the window once enough 30-day ones follow
+        starts = self._starts([40] * 3 + [30] * RECENT_CYCLES)
+        result = predict_batch(*_history(1, starts))[1]
+
+        self.assertEqual(result["predicted_cycle_length"], 30.0)
+        self.assertEqual(result["cycle_length_std"], 0.0)
+
+    def test_implausible_gaps_are_ignored(self):
+        # a 90-day gap is a missed log and a 10-day one a duplicate, not cycles
+        starts = self._starts([29, 90, 31, 10])
+        result = predict_batch(*_history(1, starts))[1]
+
+        self.assertEqual(result["predicted_cycle_length"], 30.0)
+        self.assertEqual(result["next_period_start"], starts[-1] + timedelta(days=30))
+
+    def test_single_gap_has_no_spread(self):
+        starts = self._starts([27])
+        result = predict_batch(*_history(1, starts))[1]
+
+        self.assertEqual(result["predicted_cycle_length"], 27.0)
+        self.assertIsNone(result["cycle_length_std"])
+        self.assertEqual(result["next_period_window_start"], starts[-1] + timedelta(days=25))
+        self.assertEqual(result["next_period_window_end"], starts[-1] + timedelta(days=29))
+
+    def test_fewer_than_two_cycles_use_the_fallback_length(self):
+        users, starts, ends = _history(1, [self.start])
+        result = predict_batch(users, starts, ends, fallback_lengths={1: 32})[1]
+        self.assertEqual(result["predicted_cycle_length"], 32.0)
+        self.assertEqual(result["next_period_start"], self.start + timedelta(days=32))
+
+        result = predict_batch(users, starts, ends)[1]
+        self.assertEqual(result["predicted_cycle_length"], 28.0)
+        self.assertEqual(result["predicted_period_length"], 5)
+
+    def test_users_in_one_batch_do_not_mix(self):
+        a = _history(1, self._starts([25, 25]), period_length=4)
+        b = _history(2, self._starts([35, 35]), period_length=6)
+        result = predict_batch(a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+        self.assertEqual(result[1]["predicted_cycle_length"], 25.0)
+        self.assertEqual(result[1]["predicted_period_length"], 4)
+        self.assertEqual(result[2]["predicted_cycle_length"], 35.0)
+        self.assertEqual(result[2]["predicted_period_length"], 6)
+
+    def test_empty_batch(self):
+        self.assertEqual(predict_batch([], [], []), {})
+
+
+class RefreshUsersTests(TestCase):
+    def test_chunk_bumps_every_epoch_in_one_update(self):
+        users = [User.objects.create_user(f"u{i}", password="pw") for i in range(5)]
+        for user in users:
+            UserProfile.objects.create(user=user)
+        ids = [user.id for user in users]
+        predictions.refresh_users(ids[:3])  # seeds three epoch rows
+        before = dict(CalendarEpoch.objects.values_list("user_id", "epoch"))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(predictions.refresh_users(ids), 5)
+
+        epoch_sql = [q["sql"] for q in ctx.captured_queries if "core_calendarepoch" in q["sql"]]
+        self.assertEqual(sum(sql.startswith("UPDATE") for sql in epoch_sql), 2)  # all, then first bumps
+        after = dict(CalendarEpoch.objects.values_list("user_id", "epoch"))
+        self.assertEqual(set(after), set(ids))
+        for user_id in ids[:3]:
+            self.assertEqual(after[user_id], before[user_id] + 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            predictions.refresh_users(ids)
+        self.assertEqual(sum("core_calendarepoch" in q["sql"] for q in ctx.captured_queries), 1)
+
+
+class CheckInSessionStateTests(TestCase):
+    card = 'id="checkin-overlay"'
+
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.client.force_login(self.user)
+
+    def _checkin_queries(self, ctx):
+        return sum("us13_checkin_prompt_dailycheckin" in q["sql"] for q in ctx.captured_queries)
+
+    def test_state_follows_the_write_without_reading_the_row_again(self):
+        self.assertContains(self.client.get("/habits/"), self.card)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get("/habits/"), self.card)
+        self.assertEqual(self._checkin_queries(ctx), 0)
+
+        self.assertEqual(self.client.post("/checkin/dismiss/").json(), {"status": "dismissed"})
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertNotContains(self.client.get("/habits/"), self.card)
+        self.assertEqual(self._checkin_queries(ctx), 0)
+
+    def test_a_new_session_reads_the_stored_row(self):
+        self.client.get("/habits/")
+        self.client.post("/checkin/complete/", {"response": "Calm"})
+
+        other = self.client_class()
+        other.force_login(self.user)
+        self.assertNotContains(other.get("/habits/"), self.card)
+        self.assertEqual(DailyCheckIn.objects.get(user=self.user).status, DailyCheckIn.STATUS_COMPLETED)
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        self.loads = []
+        self.cache = VersionedCache(HabitCatalogVersion, self._load, check_seconds=0)
+
+    def _load(self, version):
+        self.loads.append(version)
+        return ("value", version)
+
+    def test_reloads_only_when_the_version_row_moves(self):
+        self.assertEqual(self.cache.get(), ("value", 0))
+        self.assertEqual(self.cache.get(), ("value", 0))
+        self.assertEqual(self.loads, [0])
+
+        # another worker's bump
+        HabitCatalogVersion.objects.create(version=5)
+        self.assertEqual(self.cache.get(), ("value", 5))
+        self.cache.bump()
+        self.assertEqual(self.cache.get(), ("value", 6))
+        self.assertEqual(self.loads, [0, 5, 6])
+
+    def test_version_is_rechecked_only_after_the_interval(self):
+        cache = VersionedCache(HabitCatalogVersion, self._load)
+        cache.get()
+        with self.assertNumQueries(0):
+            cache.get()
+        HabitCatalogVersion.objects.create(version=1)
+        self.assertEqual(cache.get(), ("value", 0))
+
+    def test_shared_by_the_habit_library_and_the_prompt_bank(self):
+        self.assertIsInstance(catalog._catalog, VersionedCache)
+        self.assertIsInstance(prompts._bank, VersionedCache)
+        prompts.bump_version()
+        self.assertEqual(CheckInPromptVersion.objects.get().version, 1)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        if not search.available():
+            self.skipTest("full-text search needs SQLite FTS5")
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+
+    def _note(self, user, body, day=date(2026, 3, 1)):
+        return DayNote.objects.create(user=user, date=day, body=body)
+
+    def test_other_users_entries_never_match(self):
+        self._note(self.user, "morning walk by the river")
+        self._note(self.other, "evening walk in the rain")
+        self._note(self.other, "lighthouse visit")
+
+        results, _ = search.search(self.user.id, "walk")
+        self.assertEqual([r["snippet"] for r in results], ["morning <mark>walk</mark> by the river"])
+        self.assertEqual(search.search(self.user.id, "lighthouse"), ([], None))
+        # the owner tokens are not searchable text
+        self.assertEqual(search.search(self.user.id, f"u{self.other.id}"), ([], None))
+
+        self.client.force_login(self.other)
+        data = self.client.get("/search/", {"q": "morning"}).json()
+        self.assertEqual(data, {"results": [], "next_cursor": None})
+
+    def test_pages_cover_equal_scores_once_each(self):
+        # identical bodies score the same; rowid breaks the tie
+        days = [date(2026, 3, d) for d in range(1, 8)]
+        for day in days:
+            self._note(self.user, "gentle stretch", day=day)
+        self._note(self.other, "gentle stretch")
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            results, cursor = search.search(self.user.id, "stretch", cursor, limit=3)
+            seen += [r["date"] for r in results]
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(seen), [day.isoformat() for day in days])
+
+    def test_view_pages_and_rejects_a_bad_cursor(self):
+        for i in range(3):
+            self._note(self.user, f"tea number {i}")
+        self.client.force_login(self.user)
+
+        first = self.client.get("/search/", {"q": "tea", "limit": 2}).json()
+        self.assertEqual(len(first["results"]), 2)
+        second = self.client.get("/search/", {"q": "tea", "limit": 2, "cursor": first["next_cursor"]}).json()
+        self.assertEqual((len(second["results"]), second["next_cursor"]), (1, None))
+
+        response = self.client.get("/search/", {"q": "tea", "cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class JournalCursorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.habit = Habit.objects.create(user=self.user, name="Walk")
+        self.day = date(2026, 3, 10)
+
+    def _walk(self, limit):
+        """Every page's entries, following next_cursor to the end."""
+        pages, cursor = [], None
+        while True:
+            entries, cursor = journal.page(self.user, cursor, limit=limit)
+            pages.append([(e["kind"], e["date"], e["title"], e["text"]) for e in entries])
+            if cursor is None:
+                return pages
+
+    def test_pages_are_stable_across_entries_on_the_same_day(self):
+        # four sources and several rows of one source share the same date
+        for i in range(5):
+            DayNote.objects.create(user=self.user, date=self.day, title=f"note {i}", body="same day")
+        DailyCheckIn.objects.create(user=self.user, date=self.day, prompt_text="How?", response_text="Fine",
+                                    status=DailyCheckIn.STATUS_COMPLETED)
+        HabitLog.objects.create(user=self.user, habit=self.habit, date=self.day, status="done", reflection="hot")
+        HabitLog.objects.create(user=self.user, habit=self.habit, date=date(2020, 3, 10), status="done",
+                                reflection="cold")
+        archive.archive_before(date(2021, 1, 1))
+        DayNote.objects.create(user=self.user, date=date(2026, 3, 9), body="the day before")
+
+        everything = self._walk(limit=100)[0]
+        self.assertEqual(len(everything), 9)
+        self.assertEqual([kind for kind, *_ in everything[:7]], ["note"] * 5 + ["checkin", "habit"])
+        self.assertEqual(everything[-1][3], "cold")
+
+        for limit in (1, 2, 3, 4):
+            with self.subTest(limit=limit):
+                pages = self._walk(limit)
+                self.assertEqual([entry for page in pages for entry in page], everything)
+                self.assertTrue(all(len(page) == limit for page in pages[:-1]))
+
+    def test_new_entries_do_not_shift_later_pages(self):
+        for i in range(4):
+            DayNote.objects.create(user=self.user, date=self.day, title=f"note {i}", body="x")
+        first, cursor = journal.page(self.user, limit=2)
+        DayNote.objects.create(user=self.user, date=self.day, title="written meanwhile", body="x")
+
+        second, cursor = journal.page(self.user, cursor, limit=2)
+        self.assertEqual([e["title"] for e in first + second], ["note 3", "note 2", "note 1", "note 0"])
+        self.assertIsNone(cursor)
+
+    def test_malformed_cursor_is_a_bad_request(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/journal/").status_code, 200)
+        for cursor in ["not-a-cursor", "MjAyNi0wMi0zMHwzfDE=", "%%%"]:  # the second is 2026-02-30|3|1
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get("/journal/", {"cursor": cursor}).status_code, 400)
+        with self.assertRaises(ValueError):
+            journal.decode_cursor("bm90fGVub3VnaA==")  # "not|enough"
+
+
+class NoteAutosaveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bloom", password="pw")
+        self.note = DayNote.objects.create(user=self.user, date=date(2026, 3, 1), title="Draft", body="first")
+        self.url = f"/api/notes/{self.note.id}/"
+        self.client.force_login(self.user)
+
+    def _patch(self, changes, etag=None):
+        headers = {"HTTP_IF_MATCH": etag} if etag is not None else {}
+        return self.client.patch(self.url, json.dumps(changes), content_type="application/json", **headers)
+
+    def test_matching_etag_saves_and_moves_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self._patch({"body": "second"}, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(self.url)["ETag"], response["ETag"])
+        self.note.refresh_from_db()
+        self.assertEqual((self.note.title, self.note.body), ("Draft", "second"))
+
+        self.assertEqual(self._patch({"title": "Final"}, response["ETag"]).status_code, 200)
+
+    def test_stale_etag_gets_412_with_the_current_note(self):
+        stale = self.client.get(self.url)["ETag"]
+        self._patch({"body": "from the phone"}, stale)
+
+        response = self._patch({"body": "from the laptop"}, stale)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.json()["body"], "from the phone")
+        self.assertEqual(response["ETag"], self.client.get(self.url)["ETag"])
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.body, "from the phone")
+
+    def test_malformed_or_missing_etag(self):
+        for etag in ["abc", '"x"', '""', '"1', '"' + "9" * 30 + '"']:
+            with self.subTest(etag=etag):
+                self.assertEqual(self._patch({"body": "x"}, etag).status_code, 400)
+        self.assertEqual(self._patch({"body": "x"}).status_code, 428)
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.body, "first")
+
+        # "*" means any version
+        self.assertEqual(self._patch({"body": "forced"}, "*").status_code, 200)
+
+    def test_other_users_note_is_not_found(self):
+        other = User.objects.create_user("other", password="pw")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self._patch({"body": "x"}, "*").status_code, 404)
@@ -0,0 +1,65 @@
+"""
+core/versioned.py
+
+Per-worker caches of small, nearly static tables (the habit library, the
+check-in prompt bank), invalidated through a single-row version table.
+
+Each worker builds its value once with a loader callable and serves every
+request from it. Writes to the underlying table bump the version row (see
+core/signals.py); workers re-read that number at most every
+VERSION_CHECK_SECONDS and rebuild when it has moved.
+"""
+
+import threading
+import time
+
+from django.db.models import F
+
+VERSION_CHECK_SECONDS = 30
+
+
+class VersionedCache:
+    """
+    The value `loader(version)` built at the version held by `version_model`
+    (a model with a single `version` row). Thread-safe; values are shared
+    between threads, so loaders should return something immutable.
+    """
+
+    def __init__(self, version_model, loader, check_seconds=VERSION_CHECK_SECONDS):
+        self.version_model = version_model
+        self.loader = loader
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._entry = None  # (version, value)
+        self._checked_at = 0.0
+
+    def _current_version(self):
+        return self.version_model.objects.values_list("version", flat=True).first() or 0
+
+    def get(self):
+        """The worker's value, reloaded if the version row has moved since the last check."""
+        now = time.monotonic()
+        entry = self._entry
+        if entry is not None and now - self._checked_at < self.check_seconds:
+            return entry[1]
+
+        with self._lock:
+            if self._entry is not None and now - self._checked_at < self.check_seconds:
+                return self._entry[1]
+            version = self._current_version()
+            if self._entry is None or self._entry[0] != version:
+                self._entry = (version, self.loader(version))
+            self._checked_at = now
+            return self._entry[1]
+
+    def bump(self):
+        """Invalidate every worker's value; this worker reloads on its next read."""
+        updated = self.version_model.objects.update(version=F("version") + 1)
+        if not updated:
+            self.version_model.objects.create(version=1)
+        self.clear()
+
+    def clear(self):
+        """Drop this worker's value only."""
+        with self._lock:
+            self._entry = None
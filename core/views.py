@@ -1,12 +1,23 @@
 # core/views.py
-from datetime import date, timedelta
+from base64 import b64encode
+from collections import defaultdict
+from datetime import date
 import calendar
 
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.db.models.functions import Substr
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.db.utils import OperationalError
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_date
 
-from core.models import Cycle
+from apps.us1_create_login.models import UserProfile
+from core import calendar_cache, export, journal, predictions, search
+from core.dashboard import load_dashboard
+from core.models import DaySummary
+from core.querysets import ONE_DAY
 
 # US11 Notes model
 try:
@@ -14,42 +25,110 @@ try:
 except Exception:
     DayNote = None
 
+# how much of each note the calendar cell previews
+NOTE_PREVIEW_CHARS = 90
+NOTE_PREVIEWS_PER_DAY = 3
+
+MAX_RANGE_DAYS = 400  # a "year at a glance" plus the grid padding
+
 
 @login_required
 def dashboard(request):
     """
-    Dashboard shows a simple snapshot of current cycle info.
+    Dashboard shows a simple snapshot of current cycle info,
+    read from the predictions stored on the profile (core/predictions.py).
+    All data comes from load_dashboard() in at most two queries.
     """
-    try:
-        current_cycle = Cycle.objects.filter(user=request.user).latest("start_date")
-        today = date.today()
-
-        # If period ended, use actual length, otherwise compute days since start.
-        if current_cycle.end_date:
-            period_length = current_cycle.calculate_length()
-            day_of_cycle = period_length
-        else:
-            day_of_cycle = (today - current_cycle.start_date).days + 1
-            period_length = day_of_cycle
-
-        cycle_info = {
-            "phase_name": "Menstrual",
-            "phase_slug": "menstrual",
-            "phase_description": "Your period has started.",
-            "day_of_cycle": day_of_cycle,
-            "period_length": period_length,
-            "days_until_next_period": max(0, 28 - day_of_cycle),
+    today = date.today()
+    data = load_dashboard(request.user, today)
+
+    if data["checkin"] is not None:
+        # already loaded -> spare the check-in context processor its own lookup
+        request.checkin_context = {
+            "show_checkin": data["checkin"].is_actionable,
+            "checkin": data["checkin"],
         }
-    except Cycle.DoesNotExist:
-        cycle_info = None
 
+    latest_cycle = data["latest_cycle"]
     context = {
-        "cycle_info": cycle_info,
-        "today": date.today(),
+        "cycle_info": predictions.cycle_info(
+            data["profile"], today,
+            latest_cycle_start=latest_cycle["start_date"] if latest_cycle else None,
+        ),
+        "habits": data["habits"],
+        "today": today,
     }
     return render(request, "pages/dashboard/dashboard.html", context)
 
 
+def _day_summaries(user, start, end):
+    """date -> (flags, note_count) for the summarised days in [start, end]."""
+    rows = DaySummary.objects.for_user_range(user, start, end + ONE_DAY).values_list("date", "flags", "note_count")
+    return {day: (flags, note_count) for day, flags, note_count in rows}
+
+
+def _note_previews_by_day(user, start, end):
+    """
+    date -> list of note previews (id, title, truncated body) for [start, end],
+    newest first. The body is cut down in SQL so long notes never leave the database.
+    """
+    note_qs = (
+        DayNote.objects
+        .for_user_range(user, start, end + ONE_DAY)
+        .order_by("-created_at")
+        .values("id", "date", "title")
+        # one extra char so |truncatechars still adds the ellipsis
+        .annotate(body_preview=Substr("body", 1, NOTE_PREVIEW_CHARS + 1))
+    )
+
+    notes_by_day = defaultdict(list)
+    for note in note_qs:
+        notes_by_day[note["date"]].append(note)
+    return notes_by_day
+
+
+def _calendar_cell(day, summaries, predicted_days, notes_by_day):
+    flags, note_count = summaries.get(day, (0, 0))
+    is_period = bool(flags & DaySummary.PERIOD)
+    notes = notes_by_day.get(day, [])
+    return {
+        "date": day,
+        "is_period": is_period,
+        "is_predicted": day in predicted_days and not is_period,
+        "notes": notes[:NOTE_PREVIEWS_PER_DAY],
+        "note_count": note_count,
+        "more_notes": max(0, note_count - NOTE_PREVIEWS_PER_DAY),
+    }
+
+
+def _month_grid(user, year, month):
+    """Weeks of cell dicts for the month: period days and note counts from DaySummary, plus note previews."""
+    cal = calendar.Calendar(firstweekday=6)  # Sunday start
+    weeks = cal.monthdatescalendar(year, month)
+
+    # visible grid window, including leading/trailing days from adjacent months
+    grid_start = weeks[0][0]
+    grid_end = weeks[-1][-1]
+
+    summaries = _day_summaries(user, grid_start, grid_end)
+
+    profile = UserProfile.objects.filter(user=user).first()
+    predicted = predictions.predicted_days(profile, max(grid_start, date.today()), grid_end)
+
+    # Notes for the whole grid, grouped by day, so every cell's note count has its previews
+    notes_by_day = {}
+
+    if DayNote is not None:
+        try:
+            notes_by_day = _note_previews_by_day(user, grid_start, grid_end)
+        except OperationalError:
+            # Table not migrated yet -> keep notes empty instead of crashing
+            notes_by_day = {}
+
+    # one dict per grid cell so the template never scans the whole month
+    return [[_calendar_cell(day, summaries, predicted, notes_by_day) for day in week] for week in weeks]
+
+
 @login_required
 def calendar_view(request):
     """
@@ -64,61 +143,139 @@ def calendar_view(request):
     year = int(request.GET.get("year", today.year))
     month = int(request.GET.get("month", today.month))
 
-    # build month grid (weeks)
-    cal = calendar.Calendar(firstweekday=6)  # Sunday start
-    weeks = cal.monthdatescalendar(year, month)
-
-    # collect period days for the visible month
-    user_cycles = Cycle.objects.filter(user=request.user)
-    period_days = set()
-
-    for cycle in user_cycles:
-        start = cycle.start_date
-        # assume 5-day period if no end_date provided
-        end = cycle.end_date if cycle.end_date else (start + timedelta(days=4))
-
-        current = start
-        while current <= end:
-            if current.month == month and current.year == year:
-                period_days.add(current)
-            current += timedelta(days=1)
-
     # safe prev/next month
     prev_year, prev_month = (year, month - 1) if month > 1 else (year - 1, 12)
     next_year, next_month = (year, month + 1) if month < 12 else (year + 1, 1)
 
-    # Notes for this month
-    note_dates = set()
-    notes_for_month = []
+    # rendered grid is cached until the user's cycles/notes change (see core/signals.py)
+    cache_key = (request.user.id, year, month, today, calendar_cache.get_epoch(request.user.id))
+    grid_html = calendar_cache.month_grids.get(cache_key)
 
-    if DayNote is not None:
-        try:
-            note_qs = DayNote.objects.filter(
-                user=request.user,
-                date__year=year,
-                date__month=month,
-            ).order_by("-created_at")
-
-            notes_for_month = list(note_qs)
-            note_dates = {n.date for n in notes_for_month}
-        except OperationalError:
-            # Table not migrated yet -> keep notes empty instead of crashing
-            note_dates = set()
-            notes_for_month = []
+    if grid_html is None:
+        grid_html = render_to_string("pages/calendar/month_grid.html", {
+            "today": today,
+            "month": month,
+            "weeks": _month_grid(request.user, year, month),
+        })
+        calendar_cache.month_grids.set(cache_key, grid_html)
 
     context = {
         "today": today,
         "year": year,
         "month": month,
         "month_name": calendar.month_name[month],
-        "weeks": weeks,
-        "period_days": period_days,
+        "grid_html": grid_html,
         "prev_year": prev_year,
         "prev_month": prev_month,
         "next_year": next_year,
         "next_month": next_month,
-        "note_dates": note_dates,
-        "notes_for_month": notes_for_month,
     }
 
-    return render(request, "pages/calendar/calendar.html", context)
\ No newline at end of file
+    return render(request, "pages/calendar/calendar.html", context)
+
+
+@login_required
+def calendar_range(request):
+    """
+    JSON flags for every day in [start, end] (e.g. /calendar/range/?start=2026-01-01&end=2026-12-31).
+
+    `flags` is base64 with one byte per day starting at `start`; each byte is
+    an OR of the `bits` values. One DaySummary query, whatever the range.
+    """
+    try:
+        start = parse_date(request.GET.get("start", "") or "")
+        end = parse_date(request.GET.get("end", "") or "")
+    except ValueError:  # well-formed but impossible, e.g. 2026-02-30
+        start = end = None
+
+    if not start or not end or end < start:
+        return JsonResponse({"error": "start and end must be YYYY-MM-DD with start <= end"}, status=400)
+
+    num_days = (end - start).days + 1
+    if num_days > MAX_RANGE_DAYS:
+        return JsonResponse({"error": f"range is limited to {MAX_RANGE_DAYS} days"}, status=400)
+
+    flags = bytearray(num_days)
+    summaries = DaySummary.objects.for_user_range(request.user, start, end + ONE_DAY).values_list("date", "flags")
+    for day, day_flags in summaries:
+        flags[(day - start).days] = day_flags
+
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bits": {
+            "period": DaySummary.PERIOD, "note": DaySummary.NOTE,
+            "habit": DaySummary.HABIT, "checkin": DaySummary.CHECKIN,
+        },
+        "flags": b64encode(bytes(flags)).decode("ascii"),
+    })
+
+
+@staff_member_required
+def calendar_cache_stats(request):
+    """Hit/miss counters for this worker's month grid cache, for sizing MAX_GRIDS."""
+    return JsonResponse(calendar_cache.month_grids.stats())
+
+
+@login_required
+def export_data(request):
+    """
+    Download all of the user's data, streamed:
+    /export/ -> NDJSON, /export/?format=zip -> zip of CSVs.
+    """
+    fmt = request.GET.get("format", "ndjson")
+
+    if fmt == "zip":
+        response = StreamingHttpResponse(export.stream_zip(request.user), content_type="application/zip")
+    elif fmt == "ndjson":
+        response = StreamingHttpResponse(export.stream_ndjson(request.user), content_type="application/x-ndjson")
+    else:
+        return JsonResponse({"error": "format must be ndjson or zip"}, status=400)
+
+    extension = "zip" if fmt == "zip" else "ndjson"
+    response["Content-Disposition"] = f'attachment; filename="bloom-export-{request.user.username}.{extension}"'
+    return response
+
+
+@login_required
+def search_view(request):
+    """
+    GET ?q=words&cursor=...&limit=N over the user's notes, check-in answers and
+    habit reflections. Returns {"results": [...], "next_cursor": str | null};
+    snippets are HTML with hits wrapped in <mark>.
+    """
+    if not search.available():
+        return JsonResponse({"error": "Search is not available on this database."}, status=501)
+
+    try:
+        limit = int(request.GET.get("limit", search.PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+    limit = max(1, min(limit, search.MAX_PAGE_SIZE))
+
+    try:
+        results, next_cursor = search.search(
+            request.user.id, request.GET.get("q", ""), request.GET.get("cursor"), limit,
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
+
+
+@login_required
+def journal_view(request):
+    """
+    Notes, habit reflections and check-in answers, newest first. Pages are
+    keyset-paginated: "Older entries" links carry the last entry's ?cursor=.
+    """
+    try:
+        entries, next_cursor = journal.page(request.user, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    return render(request, "pages/journal/journal.html", {
+        "entries": entries,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("cursor"),
+    })
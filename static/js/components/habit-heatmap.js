@@ -0,0 +1,75 @@
+// ========================================
+// BLOOM - Habit Heatmap Component
+// Year-at-a-glance grid per habit, decoded from the bit-packed
+// /api/habits/heatmap/ response (2 bits per day, 4 days per byte)
+// ========================================
+
+class BloomHabitHeatmap {
+  constructor(elementId, options = {}) {
+    this.container = document.getElementById(elementId);
+    if (!this.container) {
+      console.error(`Heatmap container #${elementId} not found`);
+      return;
+    }
+    
+    this.url = options.url || '/api/habits/heatmap/';
+    this.days = options.days || 365;
+    this.colors = options.colors || ['transparent', 'rgba(0,0,0,0.08)', 'rgba(120,180,140,0.45)', 'rgba(120,180,140,0.95)'];
+    
+    this.load();
+  }
+  
+  async load() {
+    const res = await fetch(`${this.url}?days=${this.days}`, {
+      headers: { 'X-Requested-With': 'XMLHttpRequest' },
+    });
+    if (!res.ok) {
+      console.error('Heatmap fetch failed', res.status);
+      return;
+    }
+    this.render(await res.json());
+  }
+  
+  // base64 -> array of 2-bit status codes, one per day
+  static decode(bits, days) {
+    const bytes = atob(bits);
+    const codes = new Uint8Array(days);
+    for (let i = 0; i < days; i++) {
+      codes[i] = (bytes.charCodeAt(i >> 2) >> ((i & 3) * 2)) & 3;
+    }
+    return codes;
+  }
+  
+  render(data) {
+    const labels = {};
+    Object.entries(data.codes).forEach(([status, code]) => { labels[code] = status; });
+    const [y, m, d] = data.start.split('-').map(Number);
+    
+    let html = '';
+    data.habits.forEach(habit => {
+      const codes = BloomHabitHeatmap.decode(habit.bits, data.days);
+      let cells = '';
+      codes.forEach((code, i) => {
+        const day = new Date(y, m - 1, d + i).toDateString();
+        cells += `<span title="${day}: ${labels[code]}" style="width:8px;height:8px;border-radius:2px;background:${this.colors[code]};border:1px solid rgba(0,0,0,0.05);"></span>`;
+      });
+      html += `
+        <div class="heatmap-row" style="margin-bottom:12px;">
+          <div style="font-weight:600; margin-bottom:6px;">${this.escape(habit.name)}</div>
+          <div style="display:grid; grid-auto-flow:column; grid-template-rows:repeat(7, 8px); gap:2px; overflow-x:auto;">${cells}</div>
+        </div>
+      `;
+    });
+    
+    this.container.innerHTML = html || '<p class="text-muted">No habits yet.</p>';
+  }
+  
+  escape(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+  }
+}
+
+// Export
+window.BloomHabitHeatmap = BloomHabitHeatmap;
@@ -0,0 +1,91 @@
+// ========================================
+// BLOOM - Note Autosave Component
+// Debounced PATCH of changed fields to /api/notes/<id>/ with If-Match,
+// so saves from another device are never silently overwritten
+// ========================================
+
+class BloomNoteAutosave {
+  constructor(formId, options = {}) {
+    this.form = document.getElementById(formId);
+    if (!this.form) {
+      console.error(`Note form #${formId} not found`);
+      return;
+    }
+    
+    this.url = options.url || this.form.dataset.autosaveUrl;
+    this.etag = options.etag || this.form.dataset.etag;
+    this.delay = options.delay || 2000;
+    this.status = document.getElementById(options.statusId || 'autosave-status');
+    this.fields = ['title', 'body'];
+    this.saved = this.values();
+    this.timer = null;
+    this.saving = false;
+    this.conflict = false;
+    
+    this.form.addEventListener('input', () => this.schedule());
+  }
+  
+  values() {
+    const values = {};
+    this.fields.forEach(name => { values[name] = this.form.elements[name].value; });
+    return values;
+  }
+  
+  schedule() {
+    clearTimeout(this.timer);
+    this.timer = setTimeout(() => this.save(), this.delay);
+  }
+  
+  async save() {
+    if (this.conflict) return;
+    if (this.saving) {
+      this.schedule();
+      return;
+    }
+    const current = this.values();
+    const changes = {};
+    this.fields.forEach(name => {
+      if (current[name] !== this.saved[name]) changes[name] = current[name];
+    });
+    if (!Object.keys(changes).length) return;
+    
+    this.saving = true;
+    this.show('Saving…');
+    try {
+      const res = await fetch(this.url, {
+        method: 'PATCH',
+        headers: {
+          'Content-Type': 'application/json',
+          'If-Match': this.etag,
+          'X-CSRFToken': this.form.elements.csrfmiddlewaretoken.value,
+        },
+        body: JSON.stringify(changes),
+      });
+      
+      if (res.ok) {
+        this.etag = res.headers.get('ETag');
+        Object.assign(this.saved, changes);
+        this.show('Saved');
+      } else if (res.status === 412) {
+        // changed elsewhere: keep the user's text, but don't overwrite until they reload
+        this.conflict = true;
+        this.show('This note was changed on another device. Reload to see the latest version.');
+      } else {
+        const data = await res.json().catch(() => ({}));
+        this.show(data.error || 'Could not save');
+      }
+    } catch (err) {
+      this.show('Offline, will retry');
+      this.schedule();
+    } finally {
+      this.saving = false;
+    }
+  }
+  
+  show(text) {
+    if (this.status) this.status.textContent = text;
+  }
+}
+
+// Export
+window.BloomNoteAutosave = BloomNoteAutosave;